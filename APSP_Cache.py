@@ -0,0 +1,203 @@
+# A content-addressed cache of all-pairs shortest-path results:
+# the key is a hash of the input matrix (or edge list) and of the algorithm variant,
+# a bounded in-memory LRU is backed by an optional on-disk tier of .npy files (loaded memory-mapped).
+
+import typing
+import math
+import os
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from Floyd_Warshall_Weights import buildFWWeightMatrixNumpy, buildNextMatrixNumpy, reconstruct_path, format_path
+from Floyd_Warshall_Blocked import buildFWWeightMatrixBlocked
+
+INF = math.inf
+
+
+def solvePath(dist: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    '''
+    buildPathMatrix variant: the diagonal is set to 0, the distances and the next-hop matrix
+    '''
+    np.fill_diagonal(dist, 0)
+    return dist, buildNextMatrixNumpy(dist)
+
+
+# the algorithm variants: a solver from a float64 weight matrix to (the distances, the next-hop matrix or None)
+SOLVERS = {
+    'fw': lambda dist: (buildFWWeightMatrixNumpy(dist), None),
+    'blocked': lambda dist: (buildFWWeightMatrixBlocked(dist), None),
+    'path': solvePath,
+}
+
+
+def cacheKey(arr: np.ndarray, variant: str, kind: str = 'matrix') -> str:
+    '''
+    A content hash of an input array and of an algorithm variant
+    :param arr: an input array
+    :param variant: an algorithm variant
+    :param kind: an input kind ('matrix' or 'edges')
+    :return: a hex digest
+    '''
+    arr = np.ascontiguousarray(arr)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{kind}:{variant}:{arr.dtype.str}:{arr.shape}:'.encode())
+    h.update(arr.data)
+    return h.hexdigest()
+
+
+def edgesToMatrix(n: int, edges: np.ndarray) -> np.ndarray:
+    '''
+    A weight edge matrix of an edge list (the diagonal is 0, the smallest weight of parallel edges)
+    :param n: a number of vertices
+    :param edges: an array of (u, v, weight)
+    :return: a float64 weight edge matrix
+    '''
+    dist = np.full((n, n), np.inf)
+    np.fill_diagonal(dist, 0)
+    np.minimum.at(dist, (edges[:, 0].astype(np.int64), edges[:, 1].astype(np.int64)), edges[:, 2])
+    return dist
+
+
+class APSPCache:
+    '''
+    A cache of the results of the SOLVERS variants with the hit and miss counters.
+    The returned arrays are read-only, as they are shared by all the hits.
+    '''
+
+    def __init__(self, maxEntries: int = 64, directory: str = None):
+        '''
+        :param maxEntries: a number of the results kept in memory
+        :param directory: a directory of the on-disk tier (None - memory only)
+        '''
+        self.maxEntries = maxEntries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def solve(self, mat, variant: str = 'path') -> typing.Tuple[np.ndarray, typing.Optional[np.ndarray]]:
+        '''
+        All-pairs shortest paths of a weight edge matrix by a cached variant
+        :param mat: a weight edge matrix (INF if there is no edge)
+        :param variant: a key of SOLVERS
+        :return: (the distances, the next-hop matrix or None)
+        '''
+        arr = np.asarray(mat, dtype=np.float64)
+        return self.lookup(cacheKey(arr, variant), lambda: SOLVERS[variant](arr.copy()))
+
+    def solveEdges(self, n: int, edges, variant: str = 'path') -> typing.Tuple[np.ndarray, typing.Optional[np.ndarray]]:
+        '''
+        All-pairs shortest paths of an edge list by a cached variant
+        :param n: a number of vertices
+        :param edges: an edge list of (u, v, weight)
+        :param variant: a key of SOLVERS
+        :return: (the distances, the next-hop matrix or None)
+        '''
+        arr = np.asarray(edges, dtype=np.float64).reshape(-1, 3)
+        key = cacheKey(np.append(arr.ravel(), n), variant, 'edges')
+        return self.lookup(key, lambda: SOLVERS[variant](edgesToMatrix(n, arr)))
+
+    def lookup(self, key: str, compute: typing.Callable) -> typing.Tuple[np.ndarray, typing.Optional[np.ndarray]]:
+        '''
+        The memory tier, then the disk tier, then the computation
+        '''
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        result = self.load(key)
+        if result is not None:
+            self.diskHits += 1
+        else:
+            self.misses += 1
+            result = compute()
+            for arr in result:
+                if arr is not None:
+                    arr.flags.writeable = False
+            self.store(key, result)
+        self.entries[key] = result
+        if len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+        return result
+
+    def paths(self, key: str) -> typing.List[str]:
+        '''
+        The .npy files of a key in the disk tier: the distances and the next-hop matrix
+        '''
+        return [os.path.join(self.directory, key + '.dist.npy'), os.path.join(self.directory, key + '.next.npy')]
+
+    def load(self, key: str) -> typing.Optional[typing.Tuple[np.ndarray, typing.Optional[np.ndarray]]]:
+        '''
+        Loading a result from the disk tier (memory-mapped), None if it is not there
+        '''
+        if not self.directory:
+            return None
+        distPath, nextPath = self.paths(key)
+        if not os.path.exists(distPath):
+            return None
+        nxt = np.load(nextPath, mmap_mode='r') if os.path.exists(nextPath) else None
+        return np.load(distPath, mmap_mode='r'), nxt
+
+    def store(self, key: str, result: typing.Tuple[np.ndarray, typing.Optional[np.ndarray]]):
+        '''
+        Writing a result to the disk tier, every file is written to a temporary file and renamed
+        (the next-hop matrix first, as the distances file marks a complete entry)
+        '''
+        if not self.directory:
+            return
+        for arr, path in reversed(list(zip(result, self.paths(key)))):
+            if arr is not None:
+                with open(path + '.tmp', 'wb') as f:
+                    np.save(f, arr)
+                os.replace(path + '.tmp', path)
+
+    def stats(self) -> typing.Dict[str, int]:
+        '''
+        The counters of the cache
+        '''
+        return {'hits': self.hits, 'diskHits': self.diskHits, 'misses': self.misses, 'entries': len(self.entries)}
+
+    def clear(self):
+        '''
+        Clearing the memory tier (the disk tier is kept)
+        '''
+        self.entries.clear()
+
+
+#             2
+#       (0)------(3)
+#       /          \
+#  18  /            \ 4
+#     /              \
+#   (4)             (2)
+#     \             /
+#      \          /
+#    5  \       / 1
+#        \    /
+#         (3)
+
+def initInt():
+    mat = [[0, 2, INF, INF, 18],
+           [2, 0, 4, INF, INF],
+           [INF, 4, 0, 1, INF],
+           [INF, INF, 1, 0, 5],
+           [18, INF, INF, 5, 0]]
+    return mat
+
+
+def checkCache(directory=None):
+    cache = APSPCache(maxEntries=2, directory=directory)
+    for variant in ['path', 'path', 'fw', 'blocked', 'path']:
+        dist, nxt = cache.solve(initInt(), variant)
+        print(f'{variant}: the distance from 0 to 4 = {dist[0, 4]}', end='')
+        print(", the path:", format_path(reconstruct_path(nxt, 0, 4)) if nxt is not None else "")
+    print("Cache counters:", cache.stats())
+
+
+if __name__ == '__main__':
+    checkCache()
@@ -7,6 +7,8 @@
 '''
 import typing
 
+import numpy as np
+
 
 # Complexity: O(N)
 def best(a: typing.List[int]) -> typing.Tuple[int]:
@@ -46,6 +48,65 @@ def best(a: typing.List[int]) -> typing.Tuple[int]:
     return sum_max, begin_max, end_max, length
 
 
+# Complexity: O(N), vectorized by blocks
+def bestNumpy(a, block: int = 1 << 20) -> typing.Tuple[int]:
+    '''
+    The maximum subarray by prefix sums: the best interval ending at i has the sum
+    P[i + 1] - min(P[i0..i]), i0 is the first positive element (best starts there),
+    so it is np.cumsum and np.minimum.accumulate over blocks of the array,
+    the running sum and the running minimum are carried between the blocks.
+    The result and the tie-breaking are the same as of best: the first end of the max sum,
+    the begin after the last drop of the running minimum, the first max element if all numbers are <= 0
+    (for float64 arrays the rounding of the prefix sums may break an exact tie differently).
+    :param a: an one-dimensional NumPy array (int64 or float64), a memmap or a list
+    :param block: a number of elements processed at once (the memory is O(block))
+    :return: a tuple that is containing 4 elements:
+     a max sum of the interval,
+     a begin index,
+     an end index of sub-array,
+     and a length of sub-interval
+    '''
+    a = np.asarray(a)
+    n = len(a)
+    if n == 0:
+        raise IndexError("best of an empty array")
+    acc = np.int64 if a.dtype.kind in 'biu' else np.float64
+    # the first positive element
+    i0 = n
+    for b in range(0, n, block):
+        positive = a[b:b + block] > 0
+        if positive.any():
+            i0 = b + int(np.argmax(positive))
+            break
+    # extreme case: all numbers in a[] are not positive
+    if i0 == n:
+        begin_max = int(np.argmax(a))
+        return a[begin_max].item(), begin_max, begin_max, 1
+
+    total = acc(0)  # P[b] - P[i0] before the block b
+    min_val, min_pos = acc(0), i0  # the running minimum of P[t] - P[i0] and its first position
+    sum_max, begin_max, end_max = None, i0, i0
+    for b in range(i0, n, block):
+        x = a[b:b + block]
+        S = np.cumsum(x, dtype=acc)
+        S += total
+        before = np.empty_like(S)  # P[t] - P[i0] for t = b..b + len(x) - 1
+        before[0] = total
+        before[1:] = S[:-1]
+        M = np.minimum.accumulate(before)
+        np.minimum(M, min_val, out=M)
+        cand = S - M
+        r = int(np.argmax(cand))
+        if sum_max is None or cand[r] > sum_max:
+            sum_max, end_max = cand[r], b + r
+            begin_max = min_pos if M[r] == min_val else b + int(np.argmin(before[:r + 1]))
+        r = int(np.argmin(before))
+        if before[r] < min_val:
+            min_val, min_pos = before[r], b + r
+        total = S[-1]
+    return sum_max.item(), begin_max, end_max, end_max - begin_max + 1
+
+
 def test_correctness():
     # arr1 = [10, 2, -5, 8, -100, 3, 50, -80, 1, 2, 3]  # sum=53
     # arr2 = [3, -2, 5, 1]  # sum=7
@@ -91,5 +152,16 @@ def createList(size=10):
     return lst
 
 
+def test_correctness_numpy(size=1000, times=200):
+    for i in range(times):
+        lst = createList(size)
+        for arr in [lst, np.array(lst, dtype=np.int64), np.array(lst, dtype=np.float64)]:
+            if tuple(best(lst)) != tuple(bestNumpy(arr, block=64)):
+                print("Different results for", lst, best(lst), bestNumpy(arr, block=64))
+                return
+    print("bestNumpy is equal to best on", times, "random arrays")
+
+
 if __name__ == '__main__':
     test_correctness()
+    # test_correctness_numpy()
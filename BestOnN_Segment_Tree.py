@@ -0,0 +1,173 @@
+'''
+ * The maximum subarray problem for range queries with point updates:
+ * a segment tree of the mergeable summaries of BestOnN_Streaming (total, best prefix, best suffix, best interval).
+ * The tree is array-backed (a NumPy array for every field of the summary, the node k has the children 2k and 2k + 1),
+ * it is built level by level with vectorized merges.
+ * Build: O(n), a range query: O(log n), a point update: O(log n)
+'''
+import typing
+import random
+
+import numpy as np
+
+from BestOnN import best, createList
+from BestOnN_Streaming import SegmentSummary, mergeSummaries, finalizeSummary
+
+
+class MaxSubarraySegmentTree:
+    '''
+    The answers are the same as of BestOnN.best for the slice a[l:r + 1], the indices are of the whole array
+    '''
+
+    def __init__(self, a):
+        '''
+        Building the tree, the leaves after the array are empty segments
+        :param a: a non-empty one-dimensional array or list of numbers (int64 or float64)
+        '''
+        a = np.asarray(a)
+        if len(a) == 0:
+            raise IndexError("segment tree of an empty array")
+        self.dtype = np.int64 if a.dtype.kind in 'biu' else np.float64
+        # the sum of an empty segment is "minus infinity", a half of the range keeps the sums from overflowing
+        self.empty = -np.inf if self.dtype == np.float64 else np.iinfo(np.int64).min // 4
+        self.n = len(a)
+        self.size = 1 << (self.n - 1).bit_length()
+        self.fields = {}
+        for name in SegmentSummary._fields:
+            kind = self.dtype if name in ('total', 'prefix', 'suffix', 'best') else np.int64
+            self.fields[name] = np.zeros(2 * self.size, dtype=kind)
+        values = np.zeros(self.size, dtype=self.dtype)
+        values[:self.n] = a
+        self.setLeaves(np.arange(self.size, 2 * self.size), values)
+        self.fields['prefix'][self.size + self.n:] = self.empty
+        self.fields['suffix'][self.size + self.n:] = self.empty
+        self.fields['best'][self.size + self.n:] = self.empty
+        # the levels from the bottom up, every level is merged at once
+        level = self.size // 2
+        while level:
+            self.mergeLevel(np.arange(level, 2 * level))
+            level //= 2
+
+    def setLeaves(self, nodes: np.ndarray, values: np.ndarray):
+        '''
+        The summaries of the one-element segments
+        '''
+        f = self.fields
+        index = nodes - self.size
+        for name in ('total', 'prefix', 'suffix', 'best'):
+            f[name][nodes] = values
+        for name in ('prefixEnd', 'suffixBegin', 'bestBegin', 'bestEnd'):
+            f[name][nodes] = index
+        f['firstPos'][nodes] = np.where(values > 0, index, -1)
+
+    def mergeLevel(self, nodes: np.ndarray):
+        '''
+        mergeSummaries of the children for an array of nodes
+        '''
+        f = self.fields
+        a = {name: arr[2 * nodes] for name, arr in f.items()}
+        b = {name: arr[2 * nodes + 1] for name, arr in f.items()}
+        f['total'][nodes] = a['total'] + b['total']
+        takeA = a['prefix'] >= a['total'] + b['prefix']
+        f['prefix'][nodes] = np.where(takeA, a['prefix'], a['total'] + b['prefix'])
+        f['prefixEnd'][nodes] = np.where(takeA, a['prefixEnd'], b['prefixEnd'])
+        takeA = a['suffix'] + b['total'] >= b['suffix']
+        f['suffix'][nodes] = np.where(takeA, a['suffix'] + b['total'], b['suffix'])
+        f['suffixBegin'][nodes] = np.where(takeA, a['suffixBegin'], b['suffixBegin'])
+        # the max sum, then the smallest end, then the smallest begin
+        bestSum, bestBegin, bestEnd = a['best'], a['bestBegin'], a['bestEnd']
+        for s, begin, end in [(a['suffix'] + b['prefix'], a['suffixBegin'], b['prefixEnd']),
+                              (b['best'], b['bestBegin'], b['bestEnd'])]:
+            better = (s > bestSum) | ((s == bestSum) & ((end < bestEnd) | ((end == bestEnd) & (begin < bestBegin))))
+            bestSum = np.where(better, s, bestSum)
+            bestBegin = np.where(better, begin, bestBegin)
+            bestEnd = np.where(better, end, bestEnd)
+        f['best'][nodes], f['bestBegin'][nodes], f['bestEnd'][nodes] = bestSum, bestBegin, bestEnd
+        f['firstPos'][nodes] = np.where(a['firstPos'] != -1, a['firstPos'], b['firstPos'])
+
+    def node(self, k: int) -> SegmentSummary:
+        '''
+        The summary of the node k
+        '''
+        return SegmentSummary(*(self.fields[name][k].item() for name in SegmentSummary._fields))
+
+    def summary(self, l: int, r: int) -> SegmentSummary:
+        '''
+        The summary of the segment a[l..r] by the O(log n) nodes covering it
+        '''
+        if l < 0 or r >= self.n or l > r:
+            raise IndexError(f"the range [{l}, {r}] is out of [0, {self.n - 1}]")
+        left, right = None, None
+        l += self.size
+        r += self.size + 1
+        while l < r:
+            if l & 1:
+                left = self.node(l) if left is None else mergeSummaries(left, self.node(l))
+                l += 1
+            if r & 1:
+                r -= 1
+                right = self.node(r) if right is None else mergeSummaries(self.node(r), right)
+            l >>= 1
+            r >>= 1
+        if left is None:
+            return right
+        return left if right is None else mergeSummaries(left, right)
+
+    def query(self, l: int, r: int) -> typing.Tuple[int]:
+        '''
+        The maximum subarray within a[l..r]
+        Complexity: O(log n)
+        :param l: the first index of the range
+        :param r: the last index of the range
+        :return: the same tuple as BestOnN.best(a[l:r + 1]) with the indices of the whole array:
+         (a max sum, a begin index, an end index, a length)
+        '''
+        return finalizeSummary(self.summary(l, r))
+
+    def update(self, i: int, value):
+        '''
+        Setting a[i] to value and merging the summaries of its ancestors again
+        Complexity: O(log n)
+        '''
+        if i < 0 or i >= self.n:
+            raise IndexError(f"the index {i} is out of [0, {self.n - 1}]")
+        k = i + self.size
+        self.setLeaves(np.array([k]), np.array([value], dtype=self.dtype))
+        k >>= 1
+        while k:
+            merged = mergeSummaries(self.node(2 * k), self.node(2 * k + 1))
+            for name, value in zip(SegmentSummary._fields, merged):
+                self.fields[name][k] = value
+            k >>= 1
+
+    def __len__(self):
+        return self.n
+
+
+def test_segment_tree(size=30, times=300):
+    for t in range(times):
+        lst = createList(size)
+        tree = MaxSubarraySegmentTree(lst)
+        for q in range(20):
+            i = random.randrange(size)
+            lst[i] = random.randint(-size, size)
+            tree.update(i, lst[i])
+            l = random.randrange(size)
+            r = random.randrange(l, size)
+            expected = best(lst[l:r + 1])
+            expected = (expected[0], expected[1] + l, expected[2] + l, expected[3])
+            if tuple(tree.query(l, r)) != expected:
+                print("Different results for", lst, (l, r), tree.query(l, r), expected)
+                return
+    print("The segment tree is equal to best on", times * 20, "random queries with updates")
+
+    lst = [10, 2, -5, 8, -100, 3, 50, -80, 1, 2, 3]
+    tree = MaxSubarraySegmentTree(lst)
+    print('for', lst)
+    print("the range [0, 4]:", tree.query(0, 4), ", the range [5, 10]:", tree.query(5, 10))
+    tree.update(7, 80)
+    print("after a[7] = 80, the whole array:", tree.query(0, 10))
+
+
+if __name__ == '__main__':
+    test_segment_tree()
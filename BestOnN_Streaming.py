@@ -0,0 +1,184 @@
+'''
+ * The maximum subarray problem over a stream of chunks or a memory-mapped file:
+ * every chunk is reduced to a summary (total, best prefix, best suffix, best interval),
+ * two adjacent summaries are merged in O(1), so the chunks are processed in order (streaming)
+ * or in a process pool (a file on disk) and the summaries are merged in order.
+ * The result is the same as of BestOnN.best.
+ * Complexity: O(N)
+'''
+import typing
+import os
+import tempfile
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from BestOnN import best, createList
+
+
+class SegmentSummary(typing.NamedTuple):
+    total: int  # the sum of the segment
+    prefix: int  # the best prefix sum
+    prefixEnd: int  # its end index (the smallest one)
+    suffix: int  # the best suffix sum
+    suffixBegin: int  # its begin index (the smallest one)
+    best: int  # the best interval sum
+    bestBegin: int  # its begin index
+    bestEnd: int  # its end index (the smallest end, then the smallest begin)
+    firstPos: int  # the index of the first positive number, -1 if there is none
+
+
+def summarize(x, offset: int = 0) -> SegmentSummary:
+    '''
+    The summary of a chunk by prefix sums (np.cumsum and np.minimum.accumulate)
+    Complexity: O(len(x))
+    :param x: a non-empty one-dimensional array or list
+    :param offset: the index of the first element of the chunk
+    :return: the summary of the chunk
+    '''
+    x = np.asarray(x)
+    S = np.cumsum(x, dtype=np.int64 if x.dtype.kind in 'biu' else np.float64)
+    before = np.empty_like(S)  # the sums before every element of the chunk
+    before[0] = 0
+    before[1:] = S[:-1]
+    total = S[-1]
+    p = int(np.argmax(S))
+    s = int(np.argmin(before))
+    M = np.minimum.accumulate(before)
+    cand = S - M
+    e = int(np.argmax(cand))
+    b = int(np.argmin(before[:e + 1]))
+    positive = x > 0
+    firstPos = offset + int(np.argmax(positive)) if positive.any() else -1
+    return SegmentSummary(total.item(), S[p].item(), offset + p, (total - before[s]).item(), offset + s,
+                          cand[e].item(), offset + b, offset + e, firstPos)
+
+
+def mergeSummaries(a: SegmentSummary, b: SegmentSummary) -> SegmentSummary:
+    '''
+    The summary of the concatenation of two adjacent segments
+    Complexity: O(1)
+    :param a: the summary of the left segment
+    :param b: the summary of the right segment
+    :return: the summary of the whole segment
+    '''
+    prefix, prefixEnd = (a.prefix, a.prefixEnd) if a.prefix >= a.total + b.prefix \
+        else (a.total + b.prefix, b.prefixEnd)
+    suffix, suffixBegin = (a.suffix + b.total, a.suffixBegin) if a.suffix + b.total >= b.suffix \
+        else (b.suffix, b.suffixBegin)
+    # the max sum, then the smallest end, then the smallest begin
+    bestSum, bestEnd, bestBegin = min((-a.best, a.bestEnd, a.bestBegin),
+                                      (-(a.suffix + b.prefix), b.prefixEnd, a.suffixBegin),
+                                      (-b.best, b.bestEnd, b.bestBegin))
+    return SegmentSummary(a.total + b.total, prefix, prefixEnd, suffix, suffixBegin,
+                          -bestSum, bestBegin, bestEnd, a.firstPos if a.firstPos != -1 else b.firstPos)
+
+
+def finalizeSummary(summary: SegmentSummary) -> typing.Tuple[int]:
+    '''
+    The answer of BestOnN.best from the summary of the whole array:
+    best starts its interval at the first positive number, not on the zeros before it
+    :return: (a max sum of the interval, a begin index, an end index, a length of sub-interval)
+    '''
+    begin = max(summary.bestBegin, summary.firstPos)
+    return summary.best, begin, summary.bestEnd, summary.bestEnd - begin + 1
+
+
+def reduceSummaries(summaries: typing.Iterable[SegmentSummary]) -> typing.Optional[SegmentSummary]:
+    '''
+    Merging the summaries of adjacent segments in order
+    '''
+    total = None
+    for summary in summaries:
+        total = summary if total is None else mergeSummaries(total, summary)
+    return total
+
+
+def bestStream(chunks: typing.Iterable) -> typing.Tuple[int]:
+    '''
+    The maximum subarray of a stream of chunks, one chunk is in memory at a time
+    Complexity: O(N)
+    :param chunks: an iterable of one-dimensional arrays or lists (the empty ones are skipped)
+    :return: the same tuple as BestOnN.best: (a max sum, a begin index, an end index, a length)
+    '''
+    def summaries():
+        offset = 0
+        for chunk in chunks:
+            if len(chunk):
+                yield summarize(chunk, offset)
+                offset += len(chunk)
+
+    total = reduceSummaries(summaries())
+    if total is None:
+        raise IndexError("best of an empty stream")
+    return finalizeSummary(total)
+
+
+def openArray(path: str, dtype=None) -> np.ndarray:
+    '''
+    A memory-mapped one-dimensional array: a .npy file, or a raw binary file of dtype
+    '''
+    if dtype is None:
+        return np.load(path, mmap_mode='r')
+    return np.memmap(path, dtype=dtype, mode='r')
+
+
+def _summarizeRange(task: typing.Tuple[str, typing.Any, int, int]) -> SegmentSummary:
+    '''
+    The summary of the elements [b, e) of a file in a worker process (the worker maps the file itself)
+    '''
+    path, dtype, b, e = task
+    return summarize(openArray(path, dtype)[b:e], b)
+
+
+def bestFile(path: str, dtype=None, chunk: int = 1 << 22, workers: int = None) -> typing.Tuple[int]:
+    '''
+    The maximum subarray of an array in a file larger than the memory:
+    the chunks are summarized in a process pool (only the chunk bounds are sent to the workers)
+    and the summaries are merged in order
+    Complexity: O(N / workers)
+    :param path: a .npy file or a raw binary file of dtype
+    :param dtype: the dtype of a raw binary file (None for a .npy file)
+    :param chunk: a number of elements in a chunk
+    :param workers: a number of the worker processes (os.cpu_count() by default, 1 - streaming in this process)
+    :return: the same tuple as BestOnN.best: (a max sum, a begin index, an end index, a length)
+    '''
+    n = len(openArray(path, dtype))
+    if n == 0:
+        raise IndexError("best of an empty array")
+    workers = workers or os.cpu_count() or 1
+    tasks = [(path, dtype, b, min(b + chunk, n)) for b in range(0, n, chunk)]
+    if workers == 1 or len(tasks) == 1:
+        return finalizeSummary(reduceSummaries(map(_summarizeRange, tasks)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return finalizeSummary(reduceSummaries(pool.map(_summarizeRange, tasks)))
+
+
+def randomChunks(a: typing.List[int]) -> typing.List[typing.List[int]]:
+    '''
+    Splitting a list to the chunks of random sizes (with the empty ones)
+    '''
+    cuts = sorted(random.randint(0, len(a)) for _ in range(random.randint(0, 5)))
+    return [a[b:e] for b, e in zip([0] + cuts, cuts + [len(a)])]
+
+
+def test_streaming(size=50, times=1000):
+    for i in range(times):
+        lst = createList(size)
+        chunks = randomChunks(lst)
+        if tuple(best(lst)) != tuple(bestStream(chunks)):
+            print("Different results for", chunks, best(lst), bestStream(chunks))
+            return
+    print("bestStream is equal to best on", times, "random arrays")
+
+    lst = createList(100000)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'series.npy')
+        np.save(path, np.array(lst, dtype=np.int64))
+        print("best:", best(lst))
+        print("bestFile:", bestFile(path, chunk=4096, workers=2))
+
+
+if __name__ == '__main__':
+    test_streaming()
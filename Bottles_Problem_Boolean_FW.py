@@ -1,4 +1,10 @@
 import typing
+import functools
+from collections import deque
+
+import numpy as np
+
+from Sparse_Graph import CSRGraph
 
 
 '''
@@ -153,6 +159,211 @@ def isExistPath(i1: int, j1: int, i2: int, j2: int, mat: typing.List[typing.List
     print("YES! " + str(paths[i][j]) if mat[i][j] else "NO..")
 
 
+# the six transitions of a content state, generated on the fly
+def get_transitions(i: int, j: int, m: int, n: int) -> typing.List[typing.Tuple[int, int]]:
+    '''
+    The content states after one action, in the order of init_boolean_bottles_matrix:
+    emptying, filling the first bottle, emptying, filling the second bottle, pouring between them
+    :param i: a content of the first bottle
+    :param j: a content of the second bottle
+    :param m: a capacity of the first bottle
+    :param n: a capacity of the second bottle
+    :return: a list of 6 content states (i, j)
+    '''
+    return [(0, j), (m, j), (i, 0), (i, n),
+            (max(0, i + j - n), min(n, i + j)),
+            (min(m, i + j), max(0, i + j - m))]
+
+
+def bfs_bottles_path(i1: int, j1: int, i2: int, j2: int, m: int, n: int) -> typing.Optional[typing.List[typing.Tuple[int, int]]]:
+    '''
+    The shortest pouring sequence from the state (i1, j1) to the state (i2, j2)
+    by BFS over the implicit state graph (the matrix of init_boolean_bottles_matrix is never built).
+    As in the closure of FWBooleanForBottle, a path has at least one action,
+    so a state reaches itself only by a cycle.
+    Complexity: O((m + 1) * (n + 1)) time and memory
+    :param m: a capacity of the first bottle
+    :param n: a capacity of the second bottle
+    :return: a list of the content states from (i1, j1) to (i2, j2), None if there is no path
+    '''
+    source = get_index(i1, j1, n)
+    target = get_index(i2, j2, n)
+    parent = [-1] * ((m + 1) * (n + 1))
+    queue = deque([source])
+    # the source is not marked, so it can be reached again by a cycle
+    while queue:
+        k = queue.popleft()
+        for i, j in get_transitions(get_i(k, n), get_j(k, n), m, n):
+            index = get_index(i, j, n)
+            if parent[index] == -1:
+                parent[index] = k
+                if index == target:
+                    path = [index]
+                    index = k
+                    while index != source:
+                        path.append(index)
+                        index = parent[index]
+                    path.append(source)
+                    return [(get_i(index, n), get_j(index, n)) for index in reversed(path)]
+                queue.append(index)
+    return None
+
+
+def format_bottles_path(path: typing.List[typing.Tuple[int, int]]) -> str:
+    '''
+    A path in the format of FWBooleanForBottle: "(i,j)->(i',j')" for every action
+    '''
+    return "".join("(" + str(a[0]) + "," + str(a[1]) + ")->(" + str(b[0]) + "," + str(b[1]) + ")"
+                   for a, b in zip(path, path[1:]))
+
+
+# checking an existence of a path between content states of a pair of bottles without the matrices
+def isExistPathBFS(i1: int, j1: int, i2: int, j2: int, n: int, m: int) -> typing.Optional[typing.List[typing.Tuple[int, int]]]:
+    '''
+    isExistPath by BFS over the implicit state graph instead of the matrices of FWBooleanForBottle,
+    the query and the output are the same (the printed path is a shortest one)
+    Complexity: O((m + 1) * (n + 1))
+    :param i1: an initial content state of one of bottles
+    :param j1: an initial content state of the other bottle
+    :param i2: a final content state of one of bottles
+    :param j2: a final content state of the other bottle
+    :param n: a capacity of one of bottles (the smallest)
+    :param m: a capacity of the other bottle (the biggest)
+    :return: the path states if it exists otherwise None, the answer is printed as well
+    '''
+    i1, j1 = max(i1, j1), min(i1, j1)
+    i2, j2 = max(i2, j2), min(i2, j2)
+
+    print("Is there a path from (" + str(i1) + "," + str(j1) + ") to (" + str(i2) + "," + str(j2) + ")?")
+    if i1 > m or i2 > m or j1 > n or j2 > n:
+        print("NO...")
+        return None
+    path = bfs_bottles_path(i1, j1, i2, j2, m, n)
+    print("YES! " + format_bottles_path(path) if path else "NO..")
+    return path
+
+
+# the sparse transition graph: the 6 out-edges of every content state in the CSR format
+def bottles_transition_graph(m: int, n: int) -> CSRGraph:
+    '''
+    The transition graph of init_boolean_bottles_matrix in the CSR format,
+    the 6 transitions of all the states are computed at once by get_index over index arrays
+    Complexity: O((m + 1) * (n + 1))
+    :param m: a capacity of the first bottle
+    :param n: a capacity of the second bottle
+    :return: a CSR graph with exactly 6 out-edges (of the weight 1) per state, the duplicates are kept
+    '''
+    size = (m + 1) * (n + 1)
+    k = np.arange(size, dtype=np.int64)
+    i, j = get_i(k, n), get_j(k, n)
+    targets = np.stack([get_index(0, j, n), get_index(m, j, n), get_index(i, 0, n), get_index(i, n, n),
+                        get_index(np.maximum(0, i + j - n), np.minimum(n, i + j), n),
+                        get_index(np.minimum(m, i + j), np.maximum(0, i + j - m), n)], axis=1)
+    return CSRGraph(size, np.arange(0, 6 * size + 1, 6, dtype=np.int64), targets.ravel(), np.ones(6 * size))
+
+
+@functools.lru_cache(maxsize=32)
+def get_bottles_transition_graph(m: int, n: int) -> CSRGraph:
+    '''
+    bottles_transition_graph cached per a pair of capacities, the arrays are read-only
+    '''
+    graph = bottles_transition_graph(m, n)
+    for arr in graph[1:]:
+        arr.flags.writeable = False
+    return graph
+
+
+class BottlesBFSTree(typing.NamedTuple):
+    source: int  # a source state index
+    parent: np.ndarray  # the BFS tree parent of every state index (-1 for the source and the unreached states)
+    depth: np.ndarray  # the number of actions from the source (-1 if it is not reached)
+    returnParent: int  # the last state of the shortest cycle back to the source (-1 if there is none)
+
+
+def bottles_bfs_tree(graph: CSRGraph, source: int) -> BottlesBFSTree:
+    '''
+    BFS tree of the transition graph from a source state, a frontier layer is expanded at once
+    Complexity: O((m + 1) * (n + 1))
+    :param graph: a transition graph (bottles_transition_graph)
+    :param source: a source state index
+    :return: the BFS tree
+    '''
+    parent = np.full(graph.n, -1, dtype=np.int64)
+    depth = np.full(graph.n, -1, dtype=np.int64)
+    depth[source] = 0
+    returnParent = -1
+    frontier = np.array([source], dtype=np.int64)
+    d = 0
+    while len(frontier):
+        d += 1
+        owner = np.repeat(frontier, 6)
+        cand = graph.indices[(graph.indptr[frontier, None] + np.arange(6)).ravel()]
+        if returnParent == -1 and (cand == source).any():
+            returnParent = int(owner[np.argmax(cand == source)])
+        fresh = depth[cand] == -1
+        frontier, first = np.unique(cand[fresh], return_index=True)
+        parent[frontier] = owner[fresh][first]
+        depth[frontier] = d
+    return BottlesBFSTree(source, parent, depth, returnParent)
+
+
+@functools.lru_cache(maxsize=256)
+def get_bottles_bfs_tree(m: int, n: int, source: int) -> BottlesBFSTree:
+    '''
+    bottles_bfs_tree over the cached transition graph, cached per (m, n, source)
+    '''
+    return bottles_bfs_tree(get_bottles_transition_graph(m, n), source)
+
+
+def bottles_tree_path(tree: BottlesBFSTree, target: int) -> typing.Optional[typing.List[int]]:
+    '''
+    The shortest path of at least one action from the source of a BFS tree to a target state
+    (the path to the source itself is its shortest cycle, as in the closure of FWBooleanForBottle)
+    Complexity: O(path length)
+    :param tree: a BFS tree (get_bottles_bfs_tree)
+    :param target: a target state index
+    :return: a list of the state indices from the source to the target, None if there is no path
+    '''
+    path = [target]
+    if target == tree.source:
+        if tree.returnParent == -1:
+            return None
+        target = tree.returnParent
+        path.append(target)
+    elif tree.depth[target] == -1:
+        return None
+    while target != tree.source:
+        target = int(tree.parent[target])
+        path.append(target)
+    return path[::-1]
+
+
+# answering many queries of the same capacities by the cached BFS trees
+def isExistPathIndexed(i1: int, j1: int, i2: int, j2: int, n: int, m: int) -> typing.Optional[typing.List[typing.Tuple[int, int]]]:
+    '''
+    isExistPath by the cached BFS tree of the start state: the first query of a start state
+    builds the tree in O((m + 1) * (n + 1)), every next query is O(path length)
+    :param i1: an initial content state of one of bottles
+    :param j1: an initial content state of the other bottle
+    :param i2: a final content state of one of bottles
+    :param j2: a final content state of the other bottle
+    :param n: a capacity of one of bottles (the smallest)
+    :param m: a capacity of the other bottle (the biggest)
+    :return: the path states if it exists otherwise None, the answer is printed as well
+    '''
+    i1, j1 = max(i1, j1), min(i1, j1)
+    i2, j2 = max(i2, j2), min(i2, j2)
+
+    print("Is there a path from (" + str(i1) + "," + str(j1) + ") to (" + str(i2) + "," + str(j2) + ")?")
+    if i1 > m or i2 > m or j1 > n or j2 > n:
+        print("NO...")
+        return None
+    path = bottles_tree_path(get_bottles_bfs_tree(m, n, get_index(i1, j1, n)), get_index(i2, j2, n))
+    path = [(get_i(k, n), get_j(k, n)) for k in path] if path else None
+    print("YES! " + format_bottles_path(path) if path else "NO..")
+    return path
+
+
 def print_boolean_bottles_matrix(mat):
     # print(mat)
     for i in range(len(mat)):
@@ -194,6 +405,23 @@ def check_bottle_wf(m=2, n=1):
     isExistPath(0, 0, 0, 4, mat, paths, n, m)
 
 
+def check_bottle_bfs(m=500, n=300):
+    m = n if n > m else m
+    print(f'For the first bottle with a capacity m = {m} and for the second bottle with a capacity n = {n}')
+    isExistPathBFS(0, 0, 0, 4, n, m)
+    isExistPathBFS(0, 0, 0, 100, n, m)
+
+
+def check_bottle_queries(m=500, n=300):
+    m = n if n > m else m
+    print(f'For the first bottle with a capacity m = {m} and for the second bottle with a capacity n = {n}')
+    for volume in [4, 100, 200, 300, 400]:
+        isExistPathIndexed(0, 0, 0, volume, n, m)
+    print(get_bottles_bfs_tree.cache_info())
+
+
 if __name__ == '__main__':
     # check_boolean_bottles_matrix()
+    # check_bottle_bfs()
+    # check_bottle_queries()
     check_bottle_wf(5, 3)
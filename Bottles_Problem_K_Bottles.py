@@ -0,0 +1,253 @@
+'''
+ * The bottles problem for k bottles of arbitrary capacities:
+ * an action fills a bottle, empties a bottle or pours one bottle into another
+ * until the first is empty or the second is full.
+ * A content state (s_0, ..., s_{k-1}) is one integer in the mixed radix (c_0 + 1, ..., c_{k-1} + 1),
+ * for two bottles it is get_index of Bottles_Problem_Boolean_FW.
+ * BFS is vectorized over the frontier, the BFS depths are kept in a bytearray of 2 bytes per state,
+ * so tens of millions of states fit in a bounded memory.
+'''
+import typing
+
+import numpy as np
+
+UNSEEN = 0xFFFF  # the depth label of an unvisited state
+CHUNK = 1 << 16  # a number of frontier states expanded at once
+
+
+def stateStrides(capacities: typing.Sequence[int]) -> np.ndarray:
+    '''
+    The mixed-radix strides of the state encoding, the first bottle is the most significant digit
+    :param capacities: the capacities of the bottles
+    :return: an int64 array of the strides
+    '''
+    radix = np.asarray(capacities, dtype=np.int64) + 1
+    return np.r_[np.cumprod(radix[::-1])[::-1][1:], 1].astype(np.int64)
+
+
+def numberOfStates(capacities: typing.Sequence[int]) -> int:
+    return int(np.prod(np.asarray(capacities, dtype=np.int64) + 1))
+
+
+def encodeState(state: typing.Sequence[int], capacities: typing.Sequence[int]) -> int:
+    '''
+    The index of a content state
+    :param state: the contents of the bottles
+    :param capacities: the capacities of the bottles
+    :return: the state index
+    '''
+    if len(state) != len(capacities) or any(s < 0 or s > c for s, c in zip(state, capacities)):
+        raise ValueError(f"the state {tuple(state)} does not fit the capacities {tuple(capacities)}")
+    return int(np.dot(np.asarray(state, dtype=np.int64), stateStrides(capacities)))
+
+
+def decodeState(index: int, capacities: typing.Sequence[int]) -> typing.Tuple[int, ...]:
+    '''
+    The content state of an index
+    '''
+    radix = np.asarray(capacities, dtype=np.int64) + 1
+    return tuple(int(s) for s in (index // stateStrides(capacities)) % radix)
+
+
+def contents(indices: np.ndarray, capacities: np.ndarray, strides: np.ndarray) -> np.ndarray:
+    '''
+    The contents of the states: an array of the shape len(indices) x k
+    '''
+    return (indices[:, None] // strides[None, :]) % (capacities + 1)[None, :]
+
+
+def successorStates(indices: np.ndarray, capacities: np.ndarray, strides: np.ndarray) -> np.ndarray:
+    '''
+    The states after one action for an array of states: k fillings, k emptyings and k(k - 1) pourings
+    :param indices: an int64 array of the state indices
+    :param capacities: an int64 array of the capacities
+    :param strides: the strides of stateStrides
+    :return: an int64 array of the shape len(indices) x (k^2 + k)
+    '''
+    s = contents(indices, capacities, strides)
+    k = len(capacities)
+    out = [indices + (capacities[a] - s[:, a]) * strides[a] for a in range(k)]
+    out += [indices - s[:, a] * strides[a] for a in range(k)]
+    for a in range(k):
+        for b in range(k):
+            if a != b:
+                amount = np.minimum(s[:, a], capacities[b] - s[:, b])
+                out.append(indices + amount * (strides[b] - strides[a]))
+    return np.stack(out, axis=1)
+
+
+def predecessorStates(indices: np.ndarray, capacities: np.ndarray, strides: np.ndarray) -> np.ndarray:
+    '''
+    The states with an action to one of the states of an array.
+    A filled (an emptied) bottle could have any content before, a pouring of t from a to b
+    ends with an empty a or a full b, so the predecessors are enumerated by t.
+    Complexity: O(len(indices) * k^2 * max capacity)
+    :return: an int64 array of the predecessor indices (with repetitions)
+    '''
+    s = contents(indices, capacities, strides)
+    k = len(capacities)
+    out = []
+    for a in range(k):
+        for t in range(capacities[a] + 1):
+            # filling a from the content c_a - t, emptying a from the content t
+            out.append(indices[s[:, a] == capacities[a]] - t * strides[a])
+            out.append(indices[s[:, a] == 0] + t * strides[a])
+    for a in range(k):
+        for b in range(k):
+            if a != b:
+                maximal = (s[:, a] == 0) | (s[:, b] == capacities[b])
+                for t in range(1, min(capacities[a], capacities[b]) + 1):
+                    valid = maximal & (s[:, a] + t <= capacities[a]) & (s[:, b] >= t)
+                    out.append(indices[valid] + t * (strides[a] - strides[b]))
+    return np.concatenate(out) if out else np.empty(0, dtype=np.int64)
+
+
+def newLabels(total: int) -> np.ndarray:
+    '''
+    The BFS depth labels of all the states: a bytearray of 2 bytes per state viewed as uint16, UNSEEN everywhere
+    '''
+    labels = np.frombuffer(bytearray(2 * total), dtype=np.uint16)
+    labels.fill(UNSEEN)
+    return labels
+
+
+def expandLayer(frontier: np.ndarray, labels: np.ndarray, depth: int, step: typing.Callable) -> np.ndarray:
+    '''
+    One BFS layer: the unvisited neighbors (by step) of the frontier are labeled by depth
+    :return: the next frontier
+    '''
+    if depth >= UNSEEN:
+        raise ValueError("the BFS depth exceeds the range of the labels")
+    layer = []
+    for b in range(0, len(frontier), CHUNK):
+        cand = step(frontier[b:b + CHUNK]).ravel()
+        cand = np.unique(cand[labels[cand] == UNSEEN])
+        labels[cand] = depth
+        layer.append(cand)
+    return np.concatenate(layer) if layer else np.empty(0, dtype=np.int64)
+
+
+def bfsBottles(capacities: typing.Sequence[int], start: typing.Sequence[int]) -> np.ndarray:
+    '''
+    BFS from the start state over all the content states
+    Complexity: O(states * k^2) time, 2 bytes per state and the frontier of memory
+    :param capacities: the capacities of the bottles
+    :param start: the start contents
+    :return: the number of actions to every state (UNSEEN if it is not reachable), indexed by encodeState
+    '''
+    caps = np.asarray(capacities, dtype=np.int64)
+    strides = stateStrides(capacities)
+    labels = newLabels(numberOfStates(capacities))
+    frontier = np.array([encodeState(start, capacities)], dtype=np.int64)
+    labels[frontier] = 0
+    depth = 0
+    while len(frontier):
+        depth += 1
+        frontier = expandLayer(frontier, labels, depth, lambda f: successorStates(f, caps, strides))
+    return labels
+
+
+def walkLabels(index: int, labels: np.ndarray, step: typing.Callable) -> typing.List[int]:
+    '''
+    The walk from a labeled state down to the depth 0 by the neighbors (by step) with the depth one less
+    '''
+    walk = [index]
+    while labels[index] > 0:
+        cand = step(np.array([index], dtype=np.int64)).ravel()
+        index = int(cand[labels[cand] == labels[index] - 1][0])
+        walk.append(index)
+    return walk
+
+
+def shortestPouring(capacities: typing.Sequence[int], start: typing.Sequence[int], target: typing.Sequence[int]) \
+        -> typing.Optional[typing.List[typing.Tuple[int, ...]]]:
+    '''
+    The shortest sequence of actions from the start to the target state by bidirectional BFS:
+    the smaller frontier is expanded, the forward search by the actions, the backward one by the predecessors,
+    it stops at the first layer where the searches meet.
+    Complexity: O(states * k^2 * max capacity) in the worst case, usually far less
+    :param capacities: the capacities of the bottles
+    :param start: the start contents
+    :param target: the target contents
+    :return: a list of the states from the start to the target, None if the target is not reachable
+    '''
+    caps = np.asarray(capacities, dtype=np.int64)
+    strides = stateStrides(capacities)
+    total = numberOfStates(capacities)
+    steps = [lambda f: successorStates(f, caps, strides), lambda f: predecessorStates(f, caps, strides)]
+    labels = [newLabels(total), newLabels(total)]
+    frontier = [np.array([encodeState(start, capacities)], dtype=np.int64),
+                np.array([encodeState(target, capacities)], dtype=np.int64)]
+    labels[0][frontier[0]] = 0
+    labels[1][frontier[1]] = 0
+    depth = [0, 0]
+    side = 0
+    meet = frontier[0] if frontier[0][0] == frontier[1][0] else np.empty(0, dtype=np.int64)
+    while not len(meet) and len(frontier[0]) and len(frontier[1]):
+        side = 0 if len(frontier[0]) <= len(frontier[1]) else 1
+        depth[side] += 1
+        frontier[side] = expandLayer(frontier[side], labels[side], depth[side], steps[side])
+        meet = frontier[side][labels[1 - side][frontier[side]] != UNSEEN]
+    if not len(meet):
+        return None
+    # the best meeting state of the layer
+    index = int(meet[np.argmin(labels[1 - side][meet])])
+    forward = walkLabels(index, labels[0], steps[1])[::-1]
+    backward = walkLabels(index, labels[1], steps[0])
+    return [decodeState(i, capacities) for i in forward + backward[1:]]
+
+
+def shortestPouringBFS(capacities: typing.Sequence[int], start: typing.Sequence[int], target: typing.Sequence[int]) \
+        -> typing.Optional[typing.List[typing.Tuple[int, ...]]]:
+    '''
+    The shortest sequence of actions by the one-directional BFS (bfsBottles), to check shortestPouring
+    '''
+    caps = np.asarray(capacities, dtype=np.int64)
+    strides = stateStrides(capacities)
+    labels = bfsBottles(capacities, start)
+    index = encodeState(target, capacities)
+    if labels[index] == UNSEEN:
+        return None
+    walk = walkLabels(index, labels, lambda f: predecessorStates(f, caps, strides))
+    return [decodeState(i, capacities) for i in walk[::-1]]
+
+
+def reachableVolumes(capacities: typing.Sequence[int], start: typing.Sequence[int] = None) -> typing.Dict[int, int]:
+    '''
+    The minimum number of actions to measure every volume in one of the bottles
+    :param capacities: the capacities of the bottles
+    :param start: the start contents (all the bottles are empty by default)
+    :return: a dictionary of volume: the number of actions
+    '''
+    caps = np.asarray(capacities, dtype=np.int64)
+    labels = bfsBottles(capacities, start or [0] * len(capacities))
+    reached = np.flatnonzero(labels != UNSEEN)
+    s = contents(reached, caps, stateStrides(capacities))
+    volumes = {}
+    for a in range(len(capacities)):
+        order = np.argsort(labels[reached], kind='stable')
+        for v, d in zip(s[order, a].tolist(), labels[reached][order].tolist()):
+            if d < volumes.get(v, UNSEEN):
+                volumes[v] = d
+    return dict(sorted(volumes.items()))
+
+
+def check_k_bottles():
+    capacities, start, target = (8, 5, 3), (0, 0, 0), (4, 4, 0)
+    print(f'Capacities {capacities}, from {start} to {target}:')
+    path = shortestPouring(capacities, start, target)
+    print(" -> ".join(str(state) for state in path) if path else "NO..")
+    print("Measurable volumes and the minimum numbers of actions:", reachableVolumes(capacities))
+
+    capacities = (13, 17, 19, 23, 29)
+    start, target = (0, 0, 0, 0, 0), (0, 1, 5, 5, 1)
+    print(f'Capacities {capacities} ({numberOfStates(capacities)} states), from {start} to {target}:')
+    path = shortestPouring(capacities, start, target)
+    if path:
+        print(f'{len(path) - 1} actions:', " -> ".join(str(state) for state in path))
+    else:
+        print("NO..")
+
+
+if __name__ == '__main__':
+    check_k_bottles()
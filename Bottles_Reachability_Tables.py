@@ -0,0 +1,133 @@
+# Reachability tables of the bottles problem for all the capacity pairs 1 <= n <= m <= M:
+# one BFS from the empty bottles (0, 0) per pair over the transition graph of Bottles_Problem_Boolean_FW,
+# the pairs are spread over a process pool and the tables are written to one .npz file.
+
+import typing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Bottles_Problem_Boolean_FW import bottles_transition_graph, bottles_bfs_tree, get_index, get_i, get_j
+
+UNREACHABLE = -1
+
+
+class ReachabilityTables(typing.NamedTuple):
+    pours: np.ndarray  # int16: the rows of all the pairs, the row of (m, n) is m + 1 numbers: the minimum number
+    # of actions to measure the volume 0..m in one of the bottles m >= n, UNREACHABLE if it cannot be measured
+    pourOffsets: np.ndarray  # int64 (M + 1) x (M + 1): the first element of the pair (m, n) in pours
+    bits: np.ndarray  # uint8: the packed reachable states of all the pairs, a state bit in the get_index order
+    offsets: np.ndarray  # int64 (M + 1) x (M + 1): the first byte of the pair (m, n) in bits
+
+
+def pairTable(pair: typing.Tuple[int, int]) -> typing.Tuple[int, int, np.ndarray, np.ndarray]:
+    '''
+    BFS from (0, 0) for one capacity pair
+    Complexity: O((m + 1) * (n + 1))
+    :param pair: the capacities (m, n), m >= n
+    :return: (m, n, the minimum number of actions for every volume 0..m, the packed reachable states)
+    '''
+    m, n = pair
+    tree = bottles_bfs_tree(bottles_transition_graph(m, n), get_index(0, 0, n))
+    k = np.flatnonzero(tree.depth >= 0)
+    pours = np.full(m + 1, np.iinfo(np.int16).max, dtype=np.int16)
+    depth = tree.depth[k].astype(np.int16)
+    np.minimum.at(pours, get_i(k, n), depth)
+    np.minimum.at(pours, get_j(k, n), depth)
+    pours[pours == np.iinfo(np.int16).max] = UNREACHABLE
+    return m, n, pours, np.packbits(tree.depth >= 0)
+
+
+def buildReachabilityTables(M: int, workers: int = None, path: str = None) -> ReachabilityTables:
+    '''
+    The reachability tables of all the capacity pairs 1 <= n <= m <= M, one BFS per pair in a process pool
+    Complexity: O(M^4 / workers)
+    :param M: the maximum capacity
+    :param workers: a number of the worker processes (os.cpu_count() by default, 1 - in this process)
+    :param path: a .npz file for the tables (None - the tables are not saved)
+    :return: the tables
+    '''
+    workers = workers or os.cpu_count() or 1
+    pairs = [(m, n) for m in range(1, M + 1) for n in range(1, m + 1)]
+    if workers == 1:
+        results = list(map(pairTable, pairs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(pairTable, pairs, chunksize=max(1, len(pairs) // (4 * workers))))
+    pourOffsets = np.full((M + 1, M + 1), -1, dtype=np.int64)
+    offsets = np.full((M + 1, M + 1), -1, dtype=np.int64)
+    pourSizes = np.cumsum([0] + [len(pours) for _, _, pours, _ in results])
+    sizes = np.cumsum([0] + [len(bits) for _, _, _, bits in results])
+    for (m, n, _, _), pourOffset, offset in zip(results, pourSizes, sizes):
+        pourOffsets[m, n] = pourOffset
+        offsets[m, n] = offset
+    tables = ReachabilityTables(np.concatenate([pours for _, _, pours, _ in results]), pourOffsets,
+                                np.concatenate([bits for _, _, _, bits in results]), offsets)
+    if path:
+        np.savez(path, **tables._asdict())
+    return tables
+
+
+def loadReachabilityTables(path: str) -> ReachabilityTables:
+    '''
+    Loading the tables of buildReachabilityTables from a .npz file
+    '''
+    with np.load(path) as data:
+        return ReachabilityTables(*(data[name] for name in ReachabilityTables._fields))
+
+
+def tablePair(tables: ReachabilityTables, m: int, n: int) -> typing.Tuple[int, int]:
+    '''
+    The capacity pair as m >= n, it must be one of the built pairs 1 <= n <= m <= M
+    '''
+    m, n = max(m, n), min(m, n)
+    if n < 1 or m >= len(tables.offsets) or tables.offsets[m, n] < 0:
+        raise ValueError(f"the capacities ({m}, {n}) are not in the tables (1 <= n <= m <= {len(tables.offsets) - 1})")
+    return m, n
+
+
+def minimumPours(tables: ReachabilityTables, m: int, n: int, volume: int) -> int:
+    '''
+    The minimum number of actions from (0, 0) to measure a volume in one of the bottles
+    :return: the number of actions, UNREACHABLE if the volume cannot be measured
+    '''
+    m, n = tablePair(tables, m, n)
+    if volume < 0 or volume > m:
+        return UNREACHABLE
+    return int(tables.pours[tables.pourOffsets[m, n] + volume])
+
+
+def isReachableState(tables: ReachabilityTables, m: int, n: int, i: int, j: int) -> bool:
+    '''
+    Check whether the content state (i, j) of the bottles m >= n is reachable from (0, 0)
+    (the empty bottles are reachable by 0 actions)
+    '''
+    m, n = tablePair(tables, m, n)
+    if i < 0 or j < 0 or i > m or j > n:
+        return False
+    k = get_index(i, j, n)
+    return bool(tables.bits[tables.offsets[m, n] + k // 8] >> (7 - k % 8) & 1)
+
+
+def reachableStates(tables: ReachabilityTables, m: int, n: int) -> typing.List[typing.Tuple[int, int]]:
+    '''
+    All the content states of the bottles m >= n reachable from (0, 0)
+    '''
+    m, n = tablePair(tables, m, n)
+    size = (m + 1) * (n + 1)
+    bits = np.unpackbits(tables.bits[tables.offsets[m, n]:tables.offsets[m, n] + (size + 7) // 8])[:size]
+    return [(get_i(k, n), get_j(k, n)) for k in np.flatnonzero(bits).tolist()]
+
+
+def check_reachability_tables(M=12, workers=4):
+    tables = buildReachabilityTables(M, workers)
+    print(f'The minimum numbers of actions for the capacities up to M = {M} ({UNREACHABLE} - not measurable):')
+    for m, n in [(2, 1), (5, 3), (6, 4), (12, 7)]:
+        print(f'm = {m}, n = {n}:', [minimumPours(tables, m, n, v) for v in range(m + 1)])
+    print("Reachable states of m = 4, n = 2:", reachableStates(tables, 4, 2))
+    print("Is (3, 2) reachable for m = 5, n = 3?", isReachableState(tables, 5, 3, 3, 2))
+
+
+if __name__ == '__main__':
+    check_reachability_tables()
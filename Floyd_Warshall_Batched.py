@@ -0,0 +1,104 @@
+# Batched Floyd Warshall Algorithm over a stack of many small weighted graphs:
+# every k-phase is one vectorized operation over all the graphs of the batch.
+
+import typing
+import math
+
+import numpy as np
+
+from Floyd_Warshall_Weights import initNextMatrix, fromNumpyMatrix, reconstruct_path, format_path
+
+INF = math.inf
+
+
+def padBatch(matrices: typing.List[typing.List[typing.List[int]]]) -> typing.Tuple[np.ndarray, typing.List[int]]:
+    '''
+    Stacking a ragged list of weight edge matrices to a 3-D array padded by INF,
+    the padding vertices are isolated
+    :param matrices: a list of weight edge matrices (INF if there is no edge)
+    :return: (a float64 array of the shape batch x n x n, a number of vertices of every graph)
+    '''
+    sizes = [len(mat) for mat in matrices]
+    n = max(sizes, default=0)
+    dist = np.full((len(matrices), n, n), np.inf)
+    for b, mat in enumerate(matrices):
+        if sizes[b]:
+            dist[b, :sizes[b], :sizes[b]] = np.array(mat, dtype=np.float64)
+    return dist, sizes
+
+
+def buildFWBatch(dist: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Floyd-Warshall algorithm over a batch of graphs, the diagonal is set to 0 (as buildPathMatrix does)
+    Complexity: O(batch * n^3) with n vectorized steps
+    :param dist: a float64 or int array of the shape batch x n x n, it is updated in place
+    :return: (the shortest-path weights, a negative cycle flag of every graph,
+     the int32 next-hop matrices for reconstruct_path)
+    '''
+    n = dist.shape[-1]
+    diag = np.arange(n)
+    dist[:, diag, diag] = 0
+    nxt = initNextMatrix(dist)
+    buf = np.empty_like(dist)
+    better = np.empty(dist.shape, dtype=bool)
+    for k in range(n):
+        np.add(dist[:, :, k, None], dist[:, None, k, :], out=buf)
+        np.less(buf, dist, out=better)
+        np.copyto(dist, buf, where=better)
+        np.copyto(nxt, nxt[:, :, k, None], where=better)
+    negative = (dist[:, diag, diag] < 0).any(axis=1)
+    return dist, negative, nxt
+
+
+def buildFWBatchLists(matrices: typing.List[typing.List[typing.List[int]]]) \
+        -> typing.List[typing.Tuple[typing.List[typing.List[int]], bool, np.ndarray]]:
+    '''
+    Batched Floyd-Warshall algorithm for a ragged list of weight edge matrices
+    :param matrices: a list of weight edge matrices (INF if there is no edge)
+    :return: a list of (the shortest-path weight matrix, a negative cycle flag, a next-hop matrix)
+    '''
+    dist, sizes = padBatch(matrices)
+    dist, negative, nxt = buildFWBatch(dist)
+    return [(fromNumpyMatrix(dist[b, :n, :n]), bool(negative[b]), nxt[b, :n, :n])
+            for b, n in enumerate(sizes)]
+
+
+def initInt():
+    mat = [[0, 2, INF, INF, 18],
+           [2, 0, 4, INF, INF],
+           [INF, 4, 0, 1, INF],
+           [INF, INF, 1, 0, 5],
+           [18, INF, INF, 5, 0]]
+    return mat
+
+
+def init4():
+    mat = [[0, INF],
+           [-5, 0]]
+    return mat
+
+
+def init8():
+    mat = [[0, 5, INF],
+           [INF, 0, -10],
+           [2, INF, 0]]
+    return mat
+
+
+def check_batch_matrices():
+    list_matrices = [initInt(), init4(), init8()]
+    for mat, negative, nxt in buildFWBatchLists(list_matrices):
+        print("Weight matrix after FW:")
+        printMatrix(mat)
+        print("Is there a negative cycle?", "Yes" if negative else "No")
+        print("The shortest path from 0 to 1:", format_path(reconstruct_path(nxt, 0, 1)))
+        print()
+
+
+def printMatrix(mat: typing.List[typing.List[int]]):
+    for i in range(len(mat)):
+        print(mat[i])
+
+
+if __name__ == '__main__':
+    check_batch_matrices()
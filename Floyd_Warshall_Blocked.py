@@ -0,0 +1,163 @@
+# Cache-blocked (tiled) Floyd Warshall Algorithm for finding the shortest path between all the pairs of vertices
+# in a large dense weighted graph.
+
+import typing
+import math
+import time
+
+import numpy as np
+
+from Floyd_Warshall_Weights import buildFWWeightMatrixNumpy, toNumpyMatrix, fromNumpyMatrix
+
+INF = math.inf
+
+
+def fwTile(c: np.ndarray, a: np.ndarray, b: np.ndarray, buf: np.ndarray):
+    '''
+    Relaxing the tile c through the tiles a and b: c[i][j] = min(c[i][j], a[i][k] + b[k][j])
+    for every k of the k-block, one k after the other.
+    The tiles can be the same views (the diagonal tile, the row and the column tiles)
+    :param c: a tile that is updated in place
+    :param a: a column tile of the k-block
+    :param b: a row tile of the k-block
+    :param buf: a buffer at least of the shape of c
+    :return:
+    '''
+    tmp = buf[:c.shape[0], :c.shape[1]]
+    for k in range(a.shape[1]):
+        np.add(a[:, k, None], b[None, k, :], out=tmp)
+        np.minimum(c, tmp, out=c)
+
+
+def blocks(n: int, tile: int) -> typing.List[typing.Tuple[int, int]]:
+    '''
+    Splitting the range [0, n) to tiles
+    :param n: a number of vertices
+    :param tile: a tile size
+    :return: a list of the (begin, end) pairs of the tiles
+    '''
+    return [(b, min(b + tile, n)) for b in range(0, n, tile)]
+
+
+def buildFWWeightMatrixBlocked(dist: np.ndarray, tile: int = 256) -> np.ndarray:
+    '''
+    Problem 1 (blocked): Floyd-Warshall algorithm over tiles of the size tile x tile.
+    For every k-block there are three phases:
+    1. the diagonal tile,
+    2. the tiles of the k-block row and of the k-block column,
+    3. all the remaining tiles.
+    A tile is relaxed by the whole k-block while it stays in the cache.
+    Complexity: O(n^3)
+    :param dist: a float64 or int weight edge matrix (np.inf if there is no edge)
+    :param tile: a tile size
+    :return: the same matrix holding the shortest-path weights
+    '''
+    if tile < 1:
+        raise ValueError("tile size must be positive")
+    n = len(dist)
+    buf = np.empty((min(tile, n), min(tile, n)), dtype=dist.dtype)
+    tiles = blocks(n, tile)
+    for kb, ke in tiles:
+        diag = dist[kb:ke, kb:ke]
+        # phase 1: the diagonal tile
+        fwTile(diag, diag, diag, buf)
+        # phase 2: the row and the column tiles
+        for b, e in tiles:
+            if b != kb:
+                fwTile(dist[kb:ke, b:e], diag, dist[kb:ke, b:e], buf)
+                fwTile(dist[b:e, kb:ke], dist[b:e, kb:ke], diag, buf)
+        # phase 3: the remaining tiles
+        for ib, ie in tiles:
+            if ib != kb:
+                for jb, je in tiles:
+                    if jb != kb:
+                        fwTile(dist[ib:ie, jb:je], dist[ib:ie, kb:ke], dist[kb:ke, jb:je], buf)
+    return dist
+
+
+def buildFWWeightMatrixBlockedList(mat: typing.List[typing.List[int]], tile: int = 256):
+    '''
+    Problem 1: a drop-in replacement of buildFWWeightMatrix backed by buildFWWeightMatrixBlocked
+    Complexity: O(n^3)
+    :param mat: a weight edge matrix, it is updated in place
+    :param tile: a tile size
+    :return:
+    '''
+    res = fromNumpyMatrix(buildFWWeightMatrixBlocked(toNumpyMatrix(mat), tile))
+    for i in range(len(mat)):
+        mat[i][:] = res[i]
+
+
+def randomWeightMatrix(n: int, density: float = 0.1, seed: int = 0) -> np.ndarray:
+    '''
+    Building a random weight edge matrix for the benchmarks
+    :param n: a number of vertices
+    :param density: a probability of an edge
+    :param seed: a random seed
+    :return: a NumPy weight edge matrix
+    '''
+    rng = np.random.default_rng(seed)
+    dist = rng.integers(1, 100, size=(n, n)).astype(np.float64)
+    dist[rng.random((n, n)) > density] = np.inf
+    np.fill_diagonal(dist, 0)
+    return dist
+
+
+def benchmark(sizes=(512, 1024, 2048), tiles=(64, 128, 256, 512)):
+    '''
+    Comparing the blocked FW with the naive k-loop of buildFWWeightMatrixNumpy
+    '''
+    for n in sizes:
+        dist = randomWeightMatrix(n)
+        naive = dist.copy()
+        start = time.perf_counter()
+        buildFWWeightMatrixNumpy(naive)
+        naive_time = time.perf_counter() - start
+        print(f'n = {n}: naive k-loop {naive_time:.2f} s')
+        for tile in tiles:
+            blocked = dist.copy()
+            start = time.perf_counter()
+            buildFWWeightMatrixBlocked(blocked, tile)
+            blocked_time = time.perf_counter() - start
+            print(f'    tile = {tile}: blocked {blocked_time:.2f} s, speedup x{naive_time / blocked_time:.2f},'
+                  f' equal: {np.array_equal(naive, blocked)}')
+
+
+#             2
+#       (0)------(3)
+#       /          \
+#  18  /            \ 4
+#     /              \
+#   (4)             (2)
+#     \             /
+#      \          /
+#    5  \       / 1
+#        \    /
+#         (3)
+
+def initInt():
+    mat = [[0, 2, INF, INF, 18],
+           [2, 0, 4, INF, INF],
+           [INF, 4, 0, 1, INF],
+           [INF, INF, 1, 0, 5],
+           [18, INF, INF, 5, 0]]
+    return mat
+
+
+def checkBlockedFW(mat=initInt(), tile=2):
+    print("Check blocked Floyd-Warshall algorithm, tile size =", tile)
+    print("Weight matrix before FW:")
+    printMatrix(mat)
+    buildFWWeightMatrixBlockedList(mat, tile)
+    print("Weight matrix after FW:")
+    printMatrix(mat)
+
+
+def printMatrix(mat: typing.List[typing.List[int]]):
+    for i in range(len(mat)):
+        print(mat[i])
+
+
+if __name__ == '__main__':
+    checkBlockedFW()
+    # benchmark()
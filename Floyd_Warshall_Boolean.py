@@ -1,21 +1,204 @@
 import typing
 
+from Union_Find import componentsFromEdges
+
 
 # Floyd Warshall Algorithm
 
+def toBitRows(bm: typing.List[typing.List[bool]]) -> typing.List[int]:
+    '''
+    Packing a boolean matrix to bit rows: the bit j of rows[i] is bm[i][j]
+    Complexity: O(n^2)
+    :param bm: a boolean matrix
+    :return: a list of the bit rows
+    '''
+    return [int("".join("1" if x else "0" for x in reversed(row)) or "0", 2) for row in bm]
+
+
+def fromBitRows(rows: typing.List[int], n: int) -> typing.List[typing.List[bool]]:
+    '''
+    Unpacking bit rows to a boolean matrix
+    Complexity: O(n^2)
+    :param rows: a list of the bit rows
+    :param n: a number of vertices
+    :return: a boolean matrix
+    '''
+    return [[c == "1" for c in reversed(format(row, "0" + str(n) + "b"))] for row in rows] if n else []
+
+
+def buildFWBitRows(rows: typing.List[int]) -> typing.List[int]:
+    '''
+    Floyd-Warshall algorithm over the bit rows:
+    if the row i has the bit k, then row i |= row k
+    Complexity: O(n^3 / w), w is the machine word size
+    :param rows: a list of the bit rows, it is updated in place
+    :return: the same list holding the transitive closure
+    '''
+    n = len(rows)
+    for k in range(n):
+        bit = 1 << k
+        row_k = rows[k]
+        for i in range(n):
+            if rows[i] & bit:
+                rows[i] |= row_k
+    return rows
+
+
 def buildFWBooleanMatrix(bm: typing.List[typing.List[bool]]):
     '''
     Problem 1: Floyd-Warshall algorithm implementation
 	Build transitive closure of a graph
-	Complexity: O(n^3)
+	Complexity: O(n^3 / w) by the bit rows
     :param bm: a boolean matrix
     :return:
     '''
     n = len(bm)
-    for k in range(n):
-        for i in range(n):
-            for j in range(n):
-                bm[i][j] = bm[i][j] or (bm[i][k] and bm[k][j])
+    res = fromBitRows(buildFWBitRows(toBitRows(bm)), n)
+    for i in range(n):
+        bm[i][:] = res[i]
+
+
+def bitIndices(bits: int) -> typing.List[int]:
+    '''
+    The indices of the set bits
+    :param bits: a bit row
+    :return: a list of the indices
+    '''
+    res = []
+    while bits:
+        low = bits & -bits
+        res.append(low.bit_length() - 1)
+        bits ^= low
+    return res
+
+
+def stronglyConnectedComponents(adj: typing.List[typing.List[int]]) -> typing.Tuple[int, typing.List[int]]:
+    '''
+    Tarjan's algorithm (iterative) for the strongly connected components.
+    The components are numbered in a reverse topological order: an edge goes
+    from a component to a component with the same or a smaller number.
+    Complexity: O(n+m)
+    :param adj: an adjacency list of a directed graph
+    :return: a number of components and a component number of every vertex
+    '''
+    n = len(adj)
+    index = [-1] * n
+    low = [0] * n
+    onStack = [False] * n
+    stack = []
+    comp = [-1] * n
+    counter, numComponents = 0, 0
+    for s in range(n):
+        if index[s] != -1:
+            continue
+        index[s] = low[s] = counter
+        counter += 1
+        stack.append(s)
+        onStack[s] = True
+        work = [(s, 0)]
+        while work:
+            v, it = work[-1]
+            nbrs = adj[v]
+            while it < len(nbrs):
+                w = nbrs[it]
+                it += 1
+                if index[w] == -1:
+                    work[-1] = (v, it)
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    onStack[w] = True
+                    work.append((w, 0))
+                    break
+                if onStack[w]:
+                    low[v] = min(low[v], index[w])
+            else:
+                # all the edges of v are done
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    low[u] = min(low[u], low[v])
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        onStack[w] = False
+                        comp[w] = numComponents
+                        if w == v:
+                            break
+                    numComponents += 1
+    return numComponents, comp
+
+
+def buildSCCClosureFromAdjacency(adj: typing.List[typing.List[int]]) -> typing.Tuple[typing.List[int], typing.List[int]]:
+    '''
+    Transitive closure by the condensation of the strongly connected components:
+    the condensation DAG is closed in a topological order by the bit unions,
+    reach[c] is the bit row of the components that are reachable from the component c
+    by a non-empty path (the component c itself, if it has a cycle)
+    Complexity: O(n+m) for the condensation and O(m * c / w) for the closure, c is a number of components
+    :param adj: an adjacency list of a directed graph
+    :return: (a component of every vertex, the reach bit row of every component)
+    '''
+    numComponents, comp = stronglyConnectedComponents(adj)
+    succ = [set() for c in range(numComponents)]
+    cyclic = [False] * numComponents
+    for v in range(len(adj)):
+        for w in adj[v]:
+            if comp[w] != comp[v]:
+                succ[comp[v]].add(comp[w])
+            else:
+                # an edge inside a component: a self-loop or a component with a cycle
+                cyclic[comp[v]] = True
+    reach = [0] * numComponents
+    # the successors of a component have smaller numbers, so they are closed already
+    for c in range(numComponents):
+        row = (1 << c) if cyclic[c] else 0
+        for d in succ[c]:
+            row |= reach[d] | (1 << d)
+        reach[c] = row
+    return comp, reach
+
+
+def buildSCCClosure(bm: typing.List[typing.List[bool]]) -> typing.Tuple[typing.List[int], typing.List[int]]:
+    '''
+    Problem 1 (condensation): transitive closure of a graph by the strongly connected components,
+    the result is queried by reachable or expanded by expandSCCClosure
+    :param bm: a boolean matrix
+    :return: (a component of every vertex, the reach bit row of every component)
+    '''
+    return buildSCCClosureFromAdjacency([bitIndices(row) for row in toBitRows(bm)])
+
+
+def reachable(closure: typing.Tuple[typing.List[int], typing.List[int]], u: int, v: int) -> bool:
+    '''
+    Check whether there is a path from u to v (as bm[u][v] after buildFWBooleanMatrix)
+    Complexity: O(1)
+    :param closure: a result of buildSCCClosure
+    :param u: a source vertex
+    :param v: a target vertex
+    :return: true if v is reachable from u otherwise false
+    '''
+    comp, reach = closure
+    return bool(reach[comp[u]] >> comp[v] & 1)
+
+
+def expandSCCClosure(closure: typing.Tuple[typing.List[int], typing.List[int]]) -> typing.List[typing.List[bool]]:
+    '''
+    Expanding the closure of the components back to the vertex-level boolean matrix
+    Complexity: O(n^2)
+    :param closure: a result of buildSCCClosure
+    :return: a boolean matrix of the transitive closure
+    '''
+    comp, reach = closure
+    n = len(comp)
+    members = [0] * len(reach)
+    for v in range(n):
+        members[comp[v]] |= 1 << v
+    rows = [0] * len(reach)
+    for c in range(len(reach)):
+        for d in bitIndices(reach[c]):
+            rows[c] |= members[d]
+    return fromBitRows([rows[comp[v]] for v in range(n)], n)
 
 
 def buildPathMatrix(bm: typing.List[typing.List[bool]]) -> typing.List[typing.List[str]]:
@@ -49,33 +232,14 @@ def connectComponentsOfGraphBoolean(bm: typing.List[typing.List[bool]]) -> [int,
     '''
     Problem 3: Find a number of connected component
     and get a list of vertices in the each connected components
+    by union-find over the edges of the bit rows, the matrix does not need Floyd-Warshall algorithm first
+    Complexity: O(n^2 / w + m * alpha(n))
     :param bm: a boolean matrix
     :return:
     '''
-    # first, find a number of connected components
-    # in the undirected graph (square symmetric matrix)
-    n = len(bm)
-    connectComp = [0 for i in range(n)]
-    numComponentes = 0
-    for i in range(n):
-        if connectComp[i] == 0:
-            numComponentes += 1
-            # connectComp[i] - a component number of the vertex i
-            connectComp[i] = numComponentes
-        for j in range(i+1,n):
-            # vertex j is not defined yet
-            if connectComp[j] == 0 and bm[i][j]:
-                # the vertex j was defined and and the path between (i,j) exists
-                connectComp[j] = numComponentes
-
-    #last, get a vertice's list of each connected components
-    vertexInComponent = [[] for i in range(numComponentes)]
-    for i in range(len(connectComp)):
-        index = connectComp[i] - 1
-        vertexInComponent[index].append(i)
-
-    #printMatrix(vertexInComponent)
-    return numComponentes, vertexInComponent
+    # the undirected graph (square symmetric matrix)
+    rows = toBitRows(bm)
+    return componentsFromEdges(len(bm), ((i, j) for i in range(len(rows)) for j in bitIndices(rows[i])))
 
 
 
@@ -86,15 +250,8 @@ def isConnected(bm: typing.List[typing.List[bool]]) -> bool:
     :param bm: a boolean matrix
     :return: true if a graph is connected otherwise false
     '''
-    n = len(bm)
-    ans = True
-    for i in range(n):
-        if ans:
-            for j in range(n):
-                if ans:
-                    if not bm[i][j]:
-                        ans = False
-    return ans
+    full = (1 << len(bm)) - 1
+    return all(row == full for row in toBitRows(bm))
 
 def isConnectedComplexN(bm: typing.List[typing.List[bool]]) -> bool:
     '''
@@ -156,6 +313,15 @@ def checkFWBooleanMatrix():
     print("Is the graph connected?", isConnected(mat))
 
 
+def checkSCCClosure():
+    mat = Init01()
+    closure = buildSCCClosure(mat)
+    print("Component of each vertex:", closure[0])
+    print("Is 0 reachable from 3?", reachable(closure, 3, 0))
+    buildFWBooleanMatrix(mat)
+    print("Is the expanded closure equal to FW?", expandSCCClosure(closure) == mat)
+
+
 def checkComps():
     mat = Init01()
     print("Boolean matrix before FW:")
@@ -177,4 +343,5 @@ def printMatrix(mat: typing.List[typing.List[bool]]):
 
 if __name__ == '__main__':
     #checkFWBooleanMatrix()
+    #checkSCCClosure()
     checkComps()
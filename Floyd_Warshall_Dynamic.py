@@ -0,0 +1,310 @@
+# Dynamic all-pairs shortest paths: updating a computed Floyd-Warshall result
+# (the distance and the next-hop matrices of Floyd_Warshall_Weights.buildNextMatrixNumpy)
+# after edge updates instead of rerunning Floyd-Warshall algorithm from scratch.
+
+import typing
+import math
+import time
+
+import numpy as np
+
+from Floyd_Warshall_Weights import buildNextMatrixNumpy, reconstruct_path, format_path, toNumpyMatrix
+
+INF = math.inf
+
+
+def decreaseEdgeWeight(dist: np.ndarray, nxt: np.ndarray, u: int, v: int, w: float) -> int:
+    '''
+    Inserting the edge (u, v) or lowering its weight to w.
+    A pair (i, j) can improve only through the new edge: toU[i] + w + fromV[j],
+    so only the rows i with toU[i] + w < dist[i][v]
+    and the columns j with w + fromV[j] < dist[u][j] are touched.
+    toU and fromV are dist[:, u] and dist[v, :] with the empty paths toU[u] = fromV[v] = 0,
+    the diagonal of dist may be INF or the shortest cycles (the diagonal pairs are the cycles through the edge)
+    Complexity: O(rows * columns), at most O(n^2)
+    :param dist: a shortest-path weight matrix, it is updated in place
+    :param nxt: a next-hop matrix, it is updated in place
+    :param u: a source vertex of the edge
+    :param v: a target vertex of the edge
+    :param w: a new weight of the edge
+    :return: a number of the improved pairs
+    '''
+    toU = dist[:, u].copy()
+    toU[u] = 0
+    fromV = dist[v, :].copy()
+    fromV[v] = 0
+    if w + fromV[u] < 0:
+        raise ValueError("the edge update creates a negative cycle")
+    if u == v:
+        # a self-loop can only be a shorter cycle through u
+        if w < dist[u, u]:
+            dist[u, u] = w
+            nxt[u, u] = u
+            return 1
+        return 0
+    rows = np.flatnonzero(toU + w < dist[:, v])
+    if rows.size == 0:
+        return 0
+    cols = np.flatnonzero(w + fromV < dist[u, :])
+    block = np.ix_(rows, cols)
+    old = dist[block]
+    cand = toU[rows][:, None] + w + fromV[cols][None, :]
+    better = cand < old
+    # the first hop from i to the new edge (from u itself it is v)
+    hop = nxt[rows, u]
+    hop[rows == u] = v
+    dist[block] = np.where(better, cand, old)
+    nxt[block] = np.where(better, hop[:, None], nxt[block])
+    return int(better.sum())
+
+
+def applyEdgeDecreases(dist: np.ndarray, nxt: np.ndarray,
+                       updates: typing.Iterable[typing.Tuple[int, int, float]]) -> int:
+    '''
+    Applying a batch of edge insertions and weight decreases one after the other
+    Complexity: O(k * n^2) at most, k is a number of the updates
+    :param dist: a shortest-path weight matrix, it is updated in place
+    :param nxt: a next-hop matrix, it is updated in place
+    :param updates: a list of (u, v, a new weight)
+    :return: a number of the improved pairs
+    '''
+    return sum(decreaseEdgeWeight(dist, nxt, u, v, w) for u, v, w in updates)
+
+
+def recomputeColumn(weights: np.ndarray, dist: np.ndarray, nxt: np.ndarray, affected: np.ndarray, j: int):
+    '''
+    Recomputing the shortest paths from the affected vertices to j.
+    The paths of the other vertices to j are still right, so an affected vertex starts from
+    the best edge to an unaffected vertex (or to j itself by the empty path),
+    then Dijkstra's algorithm runs over the affected vertices.
+    The old distances to j are the potentials: the reduced weights w(a, b) + old[b] - old[a]
+    are non-negative after the weight increase, so the negative weights are allowed.
+    Complexity: O(|affected| * n)
+    :param weights: a weight edge matrix (already updated)
+    :param dist: a shortest-path weight matrix, the column j is updated in place
+    :param nxt: a next-hop matrix, the column j is updated in place
+    :param affected: the vertices whose shortest paths to j used the changed edge (without j)
+    :param j: a target vertex
+    :return:
+    '''
+    old = dist[affected, j]
+    # the path of j to itself is empty, dist[j][j] may be INF or a cycle
+    col = dist[:, j].copy()
+    col[j] = 0
+    isAffected = np.zeros(len(dist), dtype=bool)
+    isAffected[affected] = True
+    boundary = np.flatnonzero(~isAffected & np.isfinite(col))
+    d = np.full(len(affected), np.inf)
+    hop = np.full(len(affected), -1)
+    if boundary.size:
+        cand = weights[np.ix_(affected, boundary)] + col[boundary][None, :]
+        arg = np.argmin(cand, axis=1)
+        d = cand[np.arange(len(affected)), arg]
+        hop = boundary[arg]
+    key = d - old
+    done = np.zeros(len(affected), dtype=bool)
+    for _ in range(len(affected)):
+        a = int(np.argmin(np.where(done, np.inf, key)))
+        if done[a] or np.isinf(key[a]):
+            break
+        done[a] = True
+        cand = weights[affected, affected[a]] + d[a]
+        better = (cand < d) & ~done
+        d[better] = cand[better]
+        hop[better] = affected[a]
+        key[better] = d[better] - old[better]
+    dist[affected, j] = d
+    nxt[affected, j] = np.where(np.isinf(d), -1, hop)
+
+
+def recomputeCycle(weights: np.ndarray, dist: np.ndarray, nxt: np.ndarray, j: int):
+    '''
+    Recomputing the diagonal pair (j, j) as Floyd-Warshall algorithm defines it:
+    the smaller of the diagonal weight and the shortest cycle through j, an edge (j, b) and the path from b to j
+    Complexity: O(n)
+    :param weights: a weight edge matrix (already updated)
+    :param dist: a shortest-path weight matrix with the right column j off the diagonal, dist[j][j] is updated
+    :param nxt: a next-hop matrix, nxt[j][j] is updated
+    :param j: a vertex
+    :return:
+    '''
+    cand = weights[j, :] + dist[:, j]
+    cand[j] = weights[j, j]
+    b = int(np.argmin(cand))
+    dist[j, j] = cand[b]
+    nxt[j, j] = -1 if np.isinf(cand[b]) else b
+
+
+def increaseEdgeWeight(weights: np.ndarray, dist: np.ndarray, nxt: np.ndarray, u: int, v: int, w: float) -> int:
+    '''
+    Raising the weight of the edge (u, v) to w (INF deletes the edge).
+    Only the pairs (i, j) whose shortest paths used the edge are recomputed:
+    j with nxt[u][j] = v and i with toU[i] + dist[u][j] = dist[i][j],
+    toU is dist[:, u] with the empty path toU[u] = 0.
+    The diagonal may be INF or the shortest cycles, the pair (j, j) is the cycle through j
+    Complexity: O(sum over j of |affected(j)| * n), at most O(n^3)
+    :param weights: a weight edge matrix, it is updated in place
+    :param dist: a shortest-path weight matrix, it is updated in place
+    :param nxt: a next-hop matrix, it is updated in place
+    :param u: a source vertex of the edge
+    :param v: a target vertex of the edge
+    :param w: a new weight of the edge
+    :return: a number of the recomputed pairs
+    '''
+    weights[u, v] = w
+    total = 0
+    toU = dist[:, u].copy()
+    toU[u] = 0
+    for j in np.flatnonzero(nxt[u] == v):
+        col = dist[:, j]
+        # a superset of the pairs whose recorded paths go through u and then by the edge (u, v)
+        through = np.isfinite(toU) & np.isclose(toU + col[u], col)
+        cycle = through[j]
+        through[j] = False
+        affected = np.flatnonzero(through)
+        total += affected.size + int(cycle)
+        recomputeColumn(weights, dist, nxt, affected, j)
+        if cycle:
+            recomputeCycle(weights, dist, nxt, j)
+    return total
+
+
+def deleteEdge(weights: np.ndarray, dist: np.ndarray, nxt: np.ndarray, u: int, v: int) -> int:
+    '''
+    Deleting the edge (u, v)
+    :return: a number of the recomputed pairs
+    '''
+    return increaseEdgeWeight(weights, dist, nxt, u, v, INF)
+
+
+def updateEdgeWeight(weights: np.ndarray, dist: np.ndarray, nxt: np.ndarray, u: int, v: int, w: float) -> int:
+    '''
+    Setting the weight of the edge (u, v) to w (INF deletes the edge):
+    a decrease by decreaseEdgeWeight, an increase by increaseEdgeWeight
+    :param weights: a weight edge matrix, it is updated in place
+    :param dist: a shortest-path weight matrix, it is updated in place
+    :param nxt: a next-hop matrix, it is updated in place
+    :return: a number of the changed or the recomputed pairs
+    '''
+    if w < weights[u, v]:
+        count = decreaseEdgeWeight(dist, nxt, u, v, w)
+        weights[u, v] = w
+        return count
+    if w > weights[u, v]:
+        return increaseEdgeWeight(weights, dist, nxt, u, v, w)
+    return 0
+
+
+def applyEdgeUpdates(weights: np.ndarray, dist: np.ndarray, nxt: np.ndarray,
+                     updates: typing.Iterable[typing.Tuple[int, int, float]]) -> int:
+    '''
+    Applying a batch of edge updates (insertions, deletions, weight changes) one after the other.
+    For a batch that touches most of the shortest paths the full recomputation is faster (see benchmark)
+    :param updates: a list of (u, v, a new weight), INF deletes the edge
+    :return: a number of the changed or the recomputed pairs
+    '''
+    return sum(updateEdgeWeight(weights, dist, nxt, u, v, w) for u, v, w in updates)
+
+
+def randomEdgeUpdates(weights: np.ndarray, count: int, rng) -> typing.List[typing.Tuple[int, int, float]]:
+    '''
+    Random updates of the existing edges for the benchmark:
+    a third of deletions, a third of increases and a third of decreases
+    '''
+    src, dst = np.nonzero(np.isfinite(weights) & ~np.eye(len(weights), dtype=bool))
+    updates = []
+    for e in rng.choice(len(src), size=count, replace=False):
+        u, v = int(src[e]), int(dst[e])
+        kind = len(updates) % 3
+        w = INF if kind == 0 else weights[u, v] * 2 if kind == 1 else weights[u, v] // 2
+        updates.append((u, v, w))
+    return updates
+
+
+def benchmark(n=400, batches=(1, 10, 100), density=0.05, seed=0):
+    '''
+    Comparing the dynamic updates with the full recomputation by buildNextMatrixNumpy
+    for the zero diagonal and for the INF diagonal (the shortest cycles on the diagonal)
+    '''
+    rng = np.random.default_rng(seed)
+    edges = rng.integers(1, 100, size=(n, n)).astype(np.float64)
+    edges[rng.random((n, n)) > density] = np.inf
+    for diagonal in (0, INF):
+        weights = edges.copy()
+        np.fill_diagonal(weights, diagonal)
+        start = time.perf_counter()
+        dist = weights.copy()
+        nxt = buildNextMatrixNumpy(dist)
+        full_time = time.perf_counter() - start
+        print(f'n = {n}, the diagonal {diagonal}: full recomputation {full_time:.3f} s')
+        for count in batches:
+            updates = randomEdgeUpdates(weights, count, rng)
+            start = time.perf_counter()
+            applyEdgeUpdates(weights, dist, nxt, updates)
+            dynamic_time = time.perf_counter() - start
+            expected = weights.copy()
+            buildNextMatrixNumpy(expected)
+            print(f'    {count} updates: dynamic {dynamic_time:.3f} s, speedup x{full_time / dynamic_time:.1f},'
+                  f' equal: {np.array_equal(expected, dist)}')
+
+
+#             2
+#       (0)------(3)
+#       /          \
+#  18  /            \ 4
+#     /              \
+#   (4)             (2)
+#     \             /
+#      \          /
+#    5  \       / 1
+#        \    /
+#         (3)
+
+def initInt():
+    mat = [[0, 2, INF, INF, 18],
+           [2, 0, 4, INF, INF],
+           [INF, 4, 0, 1, INF],
+           [INF, INF, 1, 0, 5],
+           [18, INF, INF, 5, 0]]
+    return mat
+
+
+def checkEdgeDecreases():
+    dist = toNumpyMatrix(initInt())
+    nxt = buildNextMatrixNumpy(dist)
+    print("The shortest path from 0 to 4:", format_path(reconstruct_path(nxt, 0, 4)), "weight:", dist[0, 4])
+    print("Adding the edges (0, 2) with the weight 3 and (4, 0) with the weight 4")
+    print("Improved pairs:", applyEdgeDecreases(dist, nxt, [(0, 2, 3), (4, 0, 4)]))
+    print("The shortest path from 0 to 4:", format_path(reconstruct_path(nxt, 0, 4)), "weight:", dist[0, 4])
+    print("The shortest path from 4 to 1:", format_path(reconstruct_path(nxt, 4, 1)), "weight:", dist[4, 1])
+
+
+def checkInfDiagonal():
+    # the diagonal is INF (no self-loops), so dist[i][i] is the shortest cycle through i
+    dist = toNumpyMatrix([[INF, 5, INF],
+                          [INF, INF, 1],
+                          [2, INF, INF]])
+    nxt = buildNextMatrixNumpy(dist)
+    print("The shortest path from 0 to 2:", format_path(reconstruct_path(nxt, 0, 2)), "weight:", dist[0, 2])
+    print("Adding the edge (0, 2) with the weight 1")
+    print("Improved pairs:", decreaseEdgeWeight(dist, nxt, 0, 2, 1))
+    print("The shortest path from 0 to 2:", format_path(reconstruct_path(nxt, 0, 2)), "weight:", dist[0, 2])
+    print("The shortest cycle through 0:", dist[0, 0])
+
+
+def checkEdgeUpdates():
+    weights = toNumpyMatrix(initInt())
+    dist = weights.copy()
+    nxt = buildNextMatrixNumpy(dist)
+    print("The shortest path from 0 to 4:", format_path(reconstruct_path(nxt, 0, 4)), "weight:", dist[0, 4])
+    print("Deleting the edges (2, 3) and (3, 2), raising the weight of (0, 1) to 10")
+    print("Recomputed pairs:", applyEdgeUpdates(weights, dist, nxt, [(2, 3, INF), (3, 2, INF), (0, 1, 10)]))
+    print("The shortest path from 0 to 4:", format_path(reconstruct_path(nxt, 0, 4)), "weight:", dist[0, 4])
+    print("The shortest path from 2 to 3:", format_path(reconstruct_path(nxt, 2, 3)), "weight:", dist[2, 3])
+
+
+if __name__ == '__main__':
+    checkEdgeDecreases()
+    # checkInfDiagonal()
+    # checkEdgeUpdates()
+    # benchmark()
@@ -0,0 +1,187 @@
+# Floyd Warshall Algorithm over compact integer distance matrices (int32 or int16 NumPy arrays)
+# instead of Python lists of int and math.inf objects.
+# The infinity is a saturating sentinel: iinfo(dtype).max // 2, so the sum of two stored values never overflows,
+# the sums are clipped back to [-sentinel, sentinel]. math.inf is used only at the list boundary.
+
+import typing
+import math
+import time
+
+import numpy as np
+
+from Floyd_Warshall_Weights import buildFWWeightMatrixNumpy, reconstruct_path, format_path
+from Floyd_Warshall_Blocked import randomWeightMatrix
+
+INF = math.inf
+
+
+def intInfinity(dtype=np.int32) -> int:
+    '''
+    The saturating infinity sentinel of an integer dtype
+    :param dtype: np.int32 or np.int16 (or another signed integer dtype)
+    :return: iinfo(dtype).max // 2
+    '''
+    return int(np.iinfo(dtype).max // 2)
+
+
+def toIntMatrix(mat, dtype=np.int32) -> np.ndarray:
+    '''
+    Converting a weight edge matrix to an integer array, INF is stored as intInfinity(dtype)
+    :param mat: a weight edge matrix of integer weights (INF if there is no edge), a list or an array
+    :param dtype: a signed integer dtype
+    :return: an integer NumPy weight edge matrix
+    '''
+    inf = intInfinity(dtype)
+    arr = np.asarray(mat, dtype=np.float64)
+    finite = np.isfinite(arr)
+    if finite.any() and np.abs(arr[finite]).max() >= inf:
+        raise ValueError(f"the weights must be in the range ({-inf}, {inf}) for {np.dtype(dtype).name}")
+    if np.any(np.isnan(arr)) or np.any(arr == -np.inf):
+        raise ValueError("the weights must be integers or INF")
+    if not np.all(arr[finite] == np.round(arr[finite])):
+        raise ValueError("the weights must be integers or INF")
+    return np.where(finite, arr, inf).astype(dtype)
+
+
+def fromIntMatrix(dist: np.ndarray) -> typing.List[typing.List[int]]:
+    '''
+    Converting an integer distance matrix back to a list matrix with INF (math.inf)
+    (a negative cycle may saturate the weights at -intInfinity)
+    '''
+    inf = intInfinity(dist.dtype)
+    return [[INF if w >= inf else w for w in row] for row in dist.tolist()]
+
+
+def relaxInt(dist: np.ndarray, k: int, buf: np.ndarray, negative: bool) -> np.ndarray:
+    '''
+    The saturating candidates of the k-phase: buf[i][j] = dist[i][k] + dist[k][j],
+    clipped to [-inf, inf] and inf if any of the terms is inf
+    :param dist: an integer distance matrix
+    :param k: an intermediate vertex
+    :param buf: a buffer of the shape of dist
+    :param negative: are there negative weights (otherwise inf + w >= inf and the clipping is enough)
+    :return: buf
+    '''
+    inf = intInfinity(dist.dtype)
+    np.add(dist[:, k, None], dist[None, k, :], out=buf)
+    np.clip(buf, -inf, inf, out=buf)
+    if negative:
+        buf[dist[:, k] >= inf, :] = inf
+        buf[:, dist[k, :] >= inf] = inf
+    return buf
+
+
+def buildFWWeightMatrixInt(dist: np.ndarray) -> np.ndarray:
+    '''
+    Problem 1 (integer): Floyd-Warshall algorithm over an int32 or int16 matrix (see toIntMatrix)
+    Complexity: O(n^3), the memory is 4 (int32) or 2 (int16) bytes per pair
+    :param dist: an integer weight edge matrix, it is updated in place
+    :return: the same matrix holding the shortest-path weights
+    '''
+    negative = bool((dist < 0).any())
+    buf = np.empty_like(dist)
+    for k in range(len(dist)):
+        np.minimum(dist, relaxInt(dist, k, buf, negative), out=dist)
+    return dist
+
+
+def buildNextMatrixInt(dist: np.ndarray) -> np.ndarray:
+    '''
+    Problem 2 (integer): Floyd-Warshall algorithm computing the shortest-path weights
+    and the next-hop matrix over an int32 or int16 matrix
+    Complexity: O(n^3)
+    :param dist: an integer weight edge matrix, it is updated in place
+    :return: an int32 next-hop matrix (-1 if there is no path)
+    '''
+    n = len(dist)
+    inf = intInfinity(dist.dtype)
+    nxt = np.where(dist < inf, np.arange(n, dtype=np.int32), np.int32(-1)).astype(np.int32)
+    negative = bool((dist < 0).any())
+    buf = np.empty_like(dist)
+    better = np.empty(dist.shape, dtype=bool)
+    for k in range(n):
+        np.less(relaxInt(dist, k, buf, negative), dist, out=better)
+        np.copyto(dist, buf, where=better)
+        np.copyto(nxt, nxt[:, k, None], where=better)
+    return nxt
+
+
+def buildFWWeightMatrixIntList(mat: typing.List[typing.List[int]], dtype=np.int32):
+    '''
+    Problem 1: a drop-in replacement of buildFWWeightMatrix for integer weights backed by buildFWWeightMatrixInt
+    :param mat: a weight edge matrix (INF if there is no edge), it is updated in place
+    :return:
+    '''
+    res = fromIntMatrix(buildFWWeightMatrixInt(toIntMatrix(mat, dtype)))
+    for i in range(len(mat)):
+        mat[i][:] = res[i]
+
+
+def benchmark(sizes=(256, 512, 1024)):
+    '''
+    Comparing the int32 and int16 matrices with the float64 matrix of buildFWWeightMatrixNumpy
+    '''
+    for n in sizes:
+        dist = randomWeightMatrix(n)
+        start = time.perf_counter()
+        expected = buildFWWeightMatrixNumpy(dist.copy())
+        float_time = time.perf_counter() - start
+        print(f'n = {n}: float64 {float_time:.2f} s, {dist.nbytes >> 10} KiB')
+        for dtype in [np.int32, np.int16]:
+            compact = toIntMatrix(dist, dtype)
+            start = time.perf_counter()
+            buildFWWeightMatrixInt(compact)
+            int_time = time.perf_counter() - start
+            equal = np.array_equal(np.where(compact >= intInfinity(dtype), np.inf, compact), expected)
+            print(f'    {np.dtype(dtype).name}: {int_time:.2f} s, speedup x{float_time / int_time:.2f},'
+                  f' {compact.nbytes >> 10} KiB, equal: {equal}')
+
+
+#             2
+#       (0)------(3)
+#       /          \
+#  18  /            \ 4
+#     /              \
+#   (4)             (2)
+#     \             /
+#      \          /
+#    5  \       / 1
+#        \    /
+#         (3)
+
+def initInt():
+    mat = [[0, 2, INF, INF, 18],
+           [2, 0, 4, INF, INF],
+           [INF, 4, 0, 1, INF],
+           [INF, INF, 1, 0, 5],
+           [18, INF, INF, 5, 0]]
+    return mat
+
+
+def init8():
+    mat = [[0, 5, INF],
+           [INF, 0, -10],
+           [2, INF, 0]]
+    return mat
+
+
+def checkIntegerFW():
+    for mat in [initInt(), init8()]:
+        for dtype in [np.int32, np.int16]:
+            lst = [row[:] for row in mat]
+            buildFWWeightMatrixIntList(lst, dtype)
+            print(f'Weight matrix after {np.dtype(dtype).name} FW:')
+            printMatrix(lst)
+    dist = toIntMatrix(initInt(), np.int16)
+    nxt = buildNextMatrixInt(dist)
+    print("The shortest path from 0 to 4:", format_path(reconstruct_path(nxt, 0, 4)), "weight:", dist[0, 4])
+
+
+def printMatrix(mat: typing.List[typing.List[int]]):
+    for i in range(len(mat)):
+        print(mat[i])
+
+
+if __name__ == '__main__':
+    checkIntegerFW()
+    # benchmark()
@@ -3,6 +3,12 @@
 import typing
 import math
 import random
+from collections import deque
+
+import numpy as np
+
+from Floyd_Warshall_Weights import buildNextMatrix, initNextMatrix, formatPathMatrix, toNumpyMatrix, format_path
+from Sparse_Graph import CSRGraph, buildCSRGraph, csrFromWeightMatrix
 
 INF = math.inf
 
@@ -31,20 +37,10 @@ def buildPathMatrix(mat: typing.List[typing.List[int]]) -> typing.List[typing.Li
     '''
     n = len(mat)
     for i in range(n):
-        for j in range(n):
-            if i == j:
-                mat[i][j] = 0
-    # path matrix initialization:
-    pathMat = [[str(i) + "->" + str(j) if mat[i][j] != INF else "" for j in range(n)] for i in range(n)]
+        mat[i][i] = 0
 
     # path matrix building:
-    for k in range(n):
-        for i in range(n):
-            for j in range(n):
-                if mat[i][k] != INF and mat[k][j] != INF and mat[i][k] + mat[k][j] < mat[i][j]:
-                    pathMat[i][j] = pathMat[i][k] + "," + pathMat[k][j]
-                mat[i][j] = min(mat[i][j], (mat[i][k] + mat[k][j]))
-    return pathMat
+    return formatPathMatrix(buildNextMatrix(mat))
 
 
 def isNegativeCycle(mat: typing.List[typing.List[int]]) -> bool:
@@ -54,6 +50,210 @@ def isNegativeCycle(mat: typing.List[typing.List[int]]) -> bool:
             return True
     return False
 
+
+def findNegativeCycleFW(mat) -> typing.Optional[typing.Tuple[int, int]]:
+    '''
+    Floyd-Warshall algorithm with early exit: the diagonal is checked after every k-phase
+    and the algorithm stops at the first D[i][i] < 0, before the weights diverge toward -INF.
+    The diagonal is set to 0 (as buildPathMatrix does), the matrix is not changed.
+    Complexity: O(n^3) if there is no negative cycle, O(k * n^2) if it is found in the phase k
+    :param mat: a weight edge matrix (INF if there is no edge)
+    :return: (a vertex of a negative cycle, the phase k where it was found), None if there is no negative cycle
+    '''
+    dist = toNumpyMatrix(mat)
+    np.fill_diagonal(dist, 0)
+    diag = np.einsum('ii->i', dist)
+    buf = np.empty_like(dist)
+    for k in range(len(dist)):
+        np.add(dist[:, k, None], dist[None, k, :], out=buf)
+        np.minimum(dist, buf, out=dist)
+        negative = np.flatnonzero(diag < 0)
+        if negative.size:
+            return int(negative[0]), k
+    return None
+
+
+def parentCycle(parent: typing.List[int], v: int) -> typing.List[int]:
+    '''
+    A cycle of the parent pointers reached from v
+    :param parent: a parent of every vertex (-1 for none)
+    :param v: a start vertex
+    :return: the cycle vertices in the edge order, an empty list if the walk from v ends
+    '''
+    seen = set()
+    while v != -1 and v not in seen:
+        seen.add(v)
+        v = parent[v]
+    if v == -1:
+        return []
+    cycle = [v]
+    u = parent[v]
+    while u != v:
+        cycle.append(u)
+        u = parent[u]
+    return cycle[::-1]
+
+
+def findNegativeCycleSPFA(graph, source: int = None) -> typing.List[int]:
+    '''
+    Bellman-Ford algorithm with a FIFO queue (SPFA): only the vertices whose distance changed are relaxed.
+    A vertex whose shortest path has n or more edges is a witness of a negative cycle,
+    the cycle is found in the parent pointers.
+    Complexity: O(nm) in the worst case, usually close to O(m)
+    :param graph: a CSR graph or a weight edge matrix (INF if there is no edge, the diagonal is skipped)
+    :param source: a source vertex (None - a virtual source connected to all the vertices, any negative cycle)
+    :return: the vertices of a negative cycle reachable from the source in the edge order,
+     an empty list if there is no such cycle
+    '''
+    if not isinstance(graph, CSRGraph):
+        graph = csrFromWeightMatrix(graph)
+    n = graph.n
+    indptr, indices, weights = graph.indptr.tolist(), graph.indices.tolist(), graph.weights.tolist()
+    sources = range(n) if source is None else [source]
+    dist = [INF] * n
+    length = [0] * n
+    parent = [-1] * n
+    inQueue = [False] * n
+    for s in sources:
+        dist[s] = 0
+        inQueue[s] = True
+    queue = deque(sources)
+    while queue:
+        u = queue.popleft()
+        inQueue[u] = False
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            if dist[u] + weights[e] < dist[v]:
+                dist[v] = dist[u] + weights[e]
+                parent[v] = u
+                length[v] = length[u] + 1
+                if length[v] >= n:
+                    cycle = parentCycle(parent, v)
+                    if cycle:
+                        return cycle
+                if not inQueue[v]:
+                    inQueue[v] = True
+                    queue.append(v)
+    return []
+
+
+def hopWalk(nxt: typing.List[typing.List[int]], x: int, t: int) -> typing.List[int]:
+    '''
+    The walk of the next hops from x toward t, at most n steps (a walk of a diverged matrix may loop)
+    :return: the vertices of the walk, an empty list if there is no path
+    '''
+    walk = [x]
+    while x != t and len(walk) <= len(nxt):
+        x = nxt[x][t]
+        if x == -1:
+            return []
+        walk.append(x)
+    return walk
+
+
+def splitClosedWalk(walk: typing.List[int]) -> typing.List[typing.List[int]]:
+    '''
+    The simple cycles of a walk: a cycle is cut out every time a vertex repeats
+    '''
+    level = {}
+    stack = []
+    cycles = []
+    for x in walk:
+        if x in level:
+            a = level[x]
+            cycles.append(stack[a:])
+            for y in stack[a + 1:]:
+                del level[y]
+            del stack[a + 1:]
+        else:
+            level[x] = len(stack)
+            stack.append(x)
+    return cycles
+
+
+def firstNegativeWalks(weights: np.ndarray) -> typing.Dict[typing.Tuple[int, ...], float]:
+    '''
+    The phases of findNegativeCycleFW with the next hops. When D[i][i] first turns negative in the phase k,
+    its closed walk is the path from i to k and the path from k to i of the previous phase
+    (before the weights of i diverge), the walk is split into simple cycles and the negative ones are kept.
+    The sums are saturated, so the diverged weights stay finite.
+    Complexity: O(n^3)
+    :param weights: a NumPy weight edge matrix (the diagonal is skipped)
+    :return: a dictionary of the negative cycles (rotated to start at their smallest vertex): the cycle weight
+    '''
+    n = len(weights)
+    dist = weights.copy()
+    np.fill_diagonal(dist, 0)
+    nxt = initNextMatrix(dist)
+    diag = np.einsum('ii->i', dist)
+    negative = np.zeros(n, dtype=bool)
+    limit = -np.finfo(np.float64).max / 4
+    buf = np.empty_like(dist)
+    better = np.empty(dist.shape, dtype=bool)
+    cycles = {}
+    for k in range(n):
+        np.add(dist[:, k, None], dist[None, k, :], out=buf)
+        np.less(buf, dist, out=better)
+        first = np.flatnonzero(better.diagonal() & (buf.diagonal() < 0) & ~negative).tolist()
+        if first:
+            hops = nxt.tolist()
+            for i in first:
+                for cycle in splitClosedWalk(hopWalk(hops, i, k) + hopWalk(hops, k, i)[1:]):
+                    if len(cycle) > 1:
+                        cycles.update(cycleWeights(weights, [cycle]))
+        np.copyto(dist, buf, where=better)
+        np.copyto(nxt, nxt[:, k, None], where=better)
+        negative |= diag < 0
+        if negative.any():
+            np.maximum(dist, limit, out=dist)
+    if negative.any() and not cycles:
+        # the walks of the diverged phases may miss the cycles, the queue-based Bellman-Ford finds one
+        cycles.update(cycleWeights(weights, [findNegativeCycleSPFA(weights)]))
+    return cycles
+
+
+def cycleWeights(weights: np.ndarray, cycles: typing.Iterable[typing.List[int]]) \
+        -> typing.Dict[typing.Tuple[int, ...], float]:
+    '''
+    The negative ones of the cycles rotated to start at their smallest vertex with their weights by the edges
+    '''
+    res = {}
+    for cycle in cycles:
+        if not cycle:
+            continue
+        start = cycle.index(min(cycle))
+        cycle = tuple(cycle[start:] + cycle[:start])
+        weight = sum(weights[cycle[a], cycle[(a + 1) % len(cycle)]] for a in range(len(cycle))).item()
+        if weight < 0:
+            res[cycle] = weight
+    return res
+
+
+def negativeCycles(mat) -> typing.List[typing.Tuple[typing.List[int], float]]:
+    '''
+    The negative cycles of Floyd-Warshall algorithm as vertex lists, every distinct cycle once.
+    firstNegativeWalks finds the cycles of one run, then the edges of the found cycles are removed
+    and Floyd-Warshall algorithm runs again until there is no negative cycle left.
+    A negative self-loop is the cycle [i]. The reported cycles are not all the negative simple cycles
+    (there may be exponentially many), but there is one at least if there is a negative cycle.
+    Complexity: O(n^3) per run, at most one run per reported cycle
+    :param mat: a weight edge matrix (INF if there is no edge)
+    :return: a list of (the cycle vertices in the edge order, the cycle weight) sorted by the vertices
+    '''
+    weights = toNumpyMatrix(mat)
+    cycles = cycleWeights(weights, [[i] for i in range(len(weights))])
+    rest = weights.copy()
+    while True:
+        found = firstNegativeWalks(rest)
+        if not found:
+            break
+        cycles.update(found)
+        for cycle in found:
+            for a in range(len(cycle)):
+                rest[cycle[a], cycle[(a + 1) % len(cycle)]] = INF
+    return sorted((list(cycle), int(weight) if weight.is_integer() else weight) for cycle, weight in cycles.items())
+
+
 #         (v2)
 #          / \\
 #       1 /  \\ -5
@@ -140,22 +340,38 @@ def printMatrix(mat: typing.List[typing.List[int]]):
         print(mat[i])
 
 
+def checkNegativeCycleDetectors():
+    list_matrices = [init1(), init2(), init3(), init4(), init5(), init6(), init7(), init8(), init9()]
+    for mat in list_matrices:
+        printMatrix(mat)
+        found = findNegativeCycleFW(mat)
+        if found is None:
+            print("FW with early exit: no negative cycle")
+        else:
+            print("FW with early exit: vertex", found[0], "is on a negative cycle, found in the phase", found[1])
+        print("SPFA: negative cycle:", findNegativeCycleSPFA(mat))
+        print()
+    graph = buildCSRGraph(4, [(0, 1, 1), (1, 2, -3), (2, 1, 1), (3, 0, 2)])
+    print("Sparse graph, negative cycle reachable from 0:", findNegativeCycleSPFA(graph, 0))
+    print("Sparse graph, negative cycle reachable from 2:", findNegativeCycleSPFA(graph, 2))
+
+
 def checkNegativeCycle(mat=initInt()):
     print("Weight matrix before FW:")
     printMatrix(mat)
     # buildFWWeightMatrix(mat)
 
-    path = buildPathMatrix(mat)
+    weights = [row[:] for row in mat]
+    nxt = buildNextMatrix(mat)
     print("Weight matrix after FW:")
     printMatrix(mat)
 
     print("Is there a negative cycle? ",end="")
     if isNegativeCycle(mat):
         print("Yes")
-        print("All paths of a Negative cycle:")
-        for i in range(len(mat)):
-            if mat[i][i] < 0:
-                print("path vertex",i,":", path[i][i])
+        print("Negative cycles:")
+        for cycle, weight in negativeCycles(weights):
+            print(format_path(cycle + cycle[:1]), "weight:", weight)
     else:
         print("No")
 
@@ -165,3 +381,4 @@ if __name__ == '__main__':
     #checkNegativeCycle()
     print()
     check_weight_matrices()
+    # checkNegativeCycleDetectors()
@@ -0,0 +1,210 @@
+# Out-of-core Floyd Warshall Algorithm: the distance matrix lives in a .npy file opened by numpy.memmap,
+# only two row slabs of the matrix are in memory, every k-block round reads and writes the file sequentially.
+# The finished rounds are recorded in a progress file, so an interrupted run is resumed from the last round.
+
+import typing
+import math
+import os
+import json
+import tempfile
+
+import numpy as np
+
+from Floyd_Warshall_Weights import buildFWWeightMatrixNumpy
+from Floyd_Warshall_Blocked import blocks, randomWeightMatrix
+
+INF = math.inf
+
+
+def progressPath(path: str) -> str:
+    '''
+    The progress file of a distance file
+    '''
+    return path + '.progress.json'
+
+
+def readProgress(path: str) -> typing.Optional[typing.Dict]:
+    '''
+    The progress of a distance file: {'tile', 'rounds', 'done'}, None if it is not started
+    '''
+    if not os.path.exists(progressPath(path)):
+        return None
+    with open(progressPath(path)) as f:
+        return json.load(f)
+
+
+def writeProgress(path: str, progress: typing.Dict):
+    '''
+    Writing the progress to a temporary file and renaming it, so the progress file is never partial
+    '''
+    tmp = progressPath(path) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(progress, f)
+    os.replace(tmp, progressPath(path))
+
+
+def createDistanceFile(path: str, n: int, edges: typing.Iterable[typing.Tuple[int, int, float]] = (),
+                       rows: int = 1024) -> np.memmap:
+    '''
+    Creating a float64 distance file of n vertices: INF everywhere, 0 on the diagonal, then the edges
+    (the smallest weight of parallel edges). The file is filled by slabs of rows, never as a whole.
+    :param path: a .npy file
+    :param n: a number of vertices
+    :param edges: an edge list of (u, v, weight)
+    :param rows: a number of rows in a slab
+    :return: the memory-mapped matrix
+    '''
+    dist = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(n, n))
+    for b, e in blocks(n, rows):
+        dist[b:e] = np.inf
+        dist[np.arange(b, e), np.arange(b, e)] = 0
+    edges = np.asarray(list(edges), dtype=np.float64).reshape(-1, 3)
+    np.minimum.at(dist, (edges[:, 0].astype(np.int64), edges[:, 1].astype(np.int64)), edges[:, 2])
+    dist.flush()
+    if os.path.exists(progressPath(path)):
+        os.remove(progressPath(path))
+    return dist
+
+
+def saveDistanceFile(path: str, mat) -> np.memmap:
+    '''
+    Writing a weight edge matrix (a list or an array, INF if there is no edge) to a distance file
+    '''
+    dist = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(len(mat), len(mat)))
+    dist[:] = np.asarray(mat, dtype=np.float64)
+    dist.flush()
+    if os.path.exists(progressPath(path)):
+        os.remove(progressPath(path))
+    return dist
+
+
+def relaxRowSlab(slab: np.ndarray, kb: int, ke: int, buf: np.ndarray):
+    '''
+    Floyd-Warshall algorithm inside the row slab of the k-block: the rows kb..ke-1 through the vertices kb..ke-1
+    :param slab: the rows kb..ke-1 of the matrix, it is updated in place
+    :param buf: a buffer of the shape of the slab
+    '''
+    for k in range(kb, ke):
+        np.add(slab[:, k, None], slab[None, k - kb, :], out=buf)
+        np.minimum(slab, buf, out=slab)
+
+
+def relaxSlab(slab: np.ndarray, pivot: np.ndarray, kb: int, ke: int, buf: np.ndarray):
+    '''
+    Relaxing a row slab through the vertices kb..ke-1: slab[i][j] = min(slab[i][j], slab[i][k] + pivot[k][j])
+    :param slab: the rows of the matrix, it is updated in place
+    :param pivot: the relaxed row slab of the k-block
+    :param buf: a buffer at least of the shape of the slab
+    '''
+    tmp = buf[:len(slab)]
+    for k in range(kb, ke):
+        np.add(slab[:, k, None], pivot[None, k - kb, :], out=tmp)
+        np.minimum(slab, tmp, out=slab)
+
+
+def buildFWWeightMatrixOutOfCore(path: str, tile: int = 256, maxRounds: int = None) -> bool:
+    '''
+    Problem 1 (out-of-core): Floyd-Warshall algorithm over a distance file.
+    For every k-block of tile vertices there is one round:
+    1. the row slab of the k-block is read, relaxed by the k-block and written back,
+    2. every other row slab is read, relaxed through the row slab of the k-block and written back,
+    so the file is read and written sequentially and only 2 * tile * n values are in memory.
+    A round relaxes the paths by the values of the matrix, so repeating the interrupted round is safe,
+    the progress file records the finished rounds and the next call resumes from there.
+    Complexity: O(n^3), O(n^3 / tile) of disk traffic
+    :param path: a .npy distance file (see createDistanceFile, saveDistanceFile)
+    :param tile: a number of vertices in a k-block (and of rows in a slab)
+    :param maxRounds: a number of the rounds to run in this call (None - all of them)
+    :return: true if the matrix holds the shortest-path weights otherwise false (the run is not finished)
+    '''
+    if tile < 1:
+        raise ValueError("tile size must be positive")
+    progress = readProgress(path) or {'tile': tile, 'rounds': 0, 'done': False}
+    if progress['done']:
+        return True
+    if progress['tile'] != tile:
+        raise ValueError(f"the run was started with the tile size {progress['tile']}")
+    dist = np.load(path, mmap_mode='r+')
+    n = len(dist)
+    tiles = blocks(n, tile)
+    buf = np.empty((min(tile, n), n), dtype=dist.dtype)
+    rounds = 0
+    for r in range(progress['rounds'], len(tiles)):
+        if maxRounds is not None and rounds == maxRounds:
+            return False
+        kb, ke = tiles[r]
+        pivot = np.array(dist[kb:ke])
+        relaxRowSlab(pivot, kb, ke, buf[:ke - kb])
+        dist[kb:ke] = pivot
+        for b, e in tiles:
+            if b != kb:
+                slab = np.array(dist[b:e])
+                relaxSlab(slab, pivot, kb, ke, buf)
+                dist[b:e] = slab
+        dist.flush()
+        rounds += 1
+        progress['rounds'] = r + 1
+        writeProgress(path, progress)
+    progress['done'] = True
+    writeProgress(path, progress)
+    return True
+
+
+def openDistanceFile(path: str) -> np.memmap:
+    '''
+    The finished distance file opened read-only by memory-mapping
+    '''
+    progress = readProgress(path)
+    if progress is None or not progress['done']:
+        raise ValueError(f"Floyd-Warshall algorithm is not finished for {path}")
+    return np.load(path, mmap_mode='r')
+
+
+def queryDistance(path: str, u: int, v: int) -> float:
+    '''
+    The shortest-path weight from u to v in a finished distance file (only one page is read)
+    :return: the weight, INF if there is no path
+    '''
+    return float(openDistanceFile(path)[u, v])
+
+
+#             2
+#       (0)------(3)
+#       /          \
+#  18  /            \ 4
+#     /              \
+#   (4)             (2)
+#     \             /
+#      \          /
+#    5  \       / 1
+#        \    /
+#         (3)
+
+def initInt():
+    mat = [[0, 2, INF, INF, 18],
+           [2, 0, 4, INF, INF],
+           [INF, 4, 0, 1, INF],
+           [INF, INF, 1, 0, 5],
+           [18, INF, INF, 5, 0]]
+    return mat
+
+
+def checkOutOfCoreFW(n=300, tile=64):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dist.npy')
+        saveDistanceFile(path, initInt())
+        buildFWWeightMatrixOutOfCore(path, tile=2)
+        print("The shortest path weight from 0 to 4:", queryDistance(path, 0, 4))
+
+        mat = randomWeightMatrix(n)
+        saveDistanceFile(path, mat)
+        # an interrupted run: two rounds, then resuming
+        print("Finished after 2 rounds?", buildFWWeightMatrixOutOfCore(path, tile, maxRounds=2))
+        print("Progress:", readProgress(path))
+        print("Finished after resuming?", buildFWWeightMatrixOutOfCore(path, tile))
+        expected = buildFWWeightMatrixNumpy(mat.copy())
+        print("Equal to the in-memory result?", np.array_equal(openDistanceFile(path), expected))
+
+
+if __name__ == '__main__':
+    checkOutOfCoreFW()
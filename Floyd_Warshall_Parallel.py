@@ -0,0 +1,121 @@
+# Parallel blocked Floyd Warshall Algorithm for finding the shortest path between all the pairs of vertices
+# in a weighted graph: the distance matrix lives in a shared memory and the tiles are relaxed by a process pool.
+
+import typing
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Floyd_Warshall_Blocked import fwTile, blocks, randomWeightMatrix, buildFWWeightMatrixBlocked
+from Floyd_Warshall_Weights import toNumpyMatrix, fromNumpyMatrix
+
+INF = math.inf
+
+# the distance matrix of a worker process (attached to the shared memory)
+_shm = None
+_dist = None
+_buf = None
+
+
+def _attach(name: str, shape: typing.Tuple[int, int], dtype: str, tile: int):
+    '''
+    The initializer of a worker process: attaching to the shared distance matrix
+    '''
+    global _shm, _dist, _buf
+    _shm = shared_memory.SharedMemory(name=name)
+    _dist = np.ndarray(shape, dtype=dtype, buffer=_shm.buf)
+    _buf = np.empty((min(tile, shape[0]), min(tile, shape[0])), dtype=dtype)
+
+
+def _relaxTiles(tasks: typing.List[typing.Tuple[int, int, int, int, int, int]]):
+    '''
+    Relaxing the tiles (ib, ie) x (jb, je) through the k-block (kb, ke) in a worker process.
+    Only the tile bounds are sent to the worker, the tiles themselves are never pickled.
+    '''
+    for ib, ie, jb, je, kb, ke in tasks:
+        fwTile(_dist[ib:ie, jb:je], _dist[ib:ie, kb:ke], _dist[kb:ke, jb:je], _buf)
+
+
+def _chunks(tasks: list, workers: int) -> list:
+    '''
+    Splitting the tasks of a phase to about 4 chunks per worker
+    '''
+    size = max(1, len(tasks) // (4 * workers))
+    return [tasks[i:i + size] for i in range(0, len(tasks), size)]
+
+
+def buildFWWeightMatrixParallel(dist: np.ndarray, tile: int = 256, workers: int = None) -> np.ndarray:
+    '''
+    Problem 1 (parallel): the blocked Floyd-Warshall algorithm over a process pool.
+    For every k-block the diagonal tile is relaxed first (by this process), then the row and the column tiles
+    and then all the remaining tiles; the tiles of the phases 2 and 3 are independent,
+    so they are handed to the workers. The result is identical to buildFWWeightMatrixBlocked.
+    Complexity: O(n^3 / workers)
+    :param dist: a float64 or int weight edge matrix (np.inf if there is no edge)
+    :param tile: a tile size
+    :param workers: a number of the worker processes (os.cpu_count() by default)
+    :return: the same matrix holding the shortest-path weights
+    '''
+    if tile < 1:
+        raise ValueError("tile size must be positive")
+    workers = workers or os.cpu_count() or 1
+    n = len(dist)
+    if n == 0:
+        return dist
+    shm = shared_memory.SharedMemory(create=True, size=dist.nbytes)
+    try:
+        shared = np.ndarray(dist.shape, dtype=dist.dtype, buffer=shm.buf)
+        shared[:] = dist
+        tiles = blocks(n, tile)
+        buf = np.empty((min(tile, n), min(tile, n)), dtype=dist.dtype)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, dist.shape, dist.dtype.str, tile)) as pool:
+            for kb, ke in tiles:
+                # phase 1: the diagonal tile (in this process)
+                diag = shared[kb:ke, kb:ke]
+                fwTile(diag, diag, diag, buf)
+                # phase 2: the row and the column tiles
+                tasks = []
+                for b, e in tiles:
+                    if b != kb:
+                        tasks.append((kb, ke, b, e, kb, ke))
+                        tasks.append((b, e, kb, ke, kb, ke))
+                list(pool.map(_relaxTiles, _chunks(tasks, workers)))
+                # phase 3: the remaining tiles
+                tasks = [(ib, ie, jb, je, kb, ke) for ib, ie in tiles if ib != kb
+                         for jb, je in tiles if jb != kb]
+                list(pool.map(_relaxTiles, _chunks(tasks, workers)))
+        dist[:] = shared
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return dist
+
+
+def buildFWWeightMatrixParallelList(mat: typing.List[typing.List[int]], tile: int = 256, workers: int = None):
+    '''
+    Problem 1: a drop-in replacement of buildFWWeightMatrix backed by buildFWWeightMatrixParallel
+    :param mat: a weight edge matrix, it is updated in place
+    :param tile: a tile size
+    :param workers: a number of the worker processes
+    :return:
+    '''
+    res = fromNumpyMatrix(buildFWWeightMatrixParallel(toNumpyMatrix(mat), tile, workers))
+    for i in range(len(mat)):
+        mat[i][:] = res[i]
+
+
+def checkParallelFW(n=300, tile=64, workers=4):
+    print(f'Check parallel Floyd-Warshall algorithm: n = {n}, tile = {tile}, workers = {workers}')
+    dist = randomWeightMatrix(n)
+    serial = buildFWWeightMatrixBlocked(dist.copy(), tile)
+    parallel = buildFWWeightMatrixParallel(dist.copy(), tile, workers)
+    print("Is the result identical to the serial engine?", np.array_equal(serial, parallel))
+
+
+if __name__ == '__main__':
+    checkParallelFW()
@@ -4,6 +4,10 @@ import typing
 import math
 import random
 
+import numpy as np
+
+from Union_Find import componentsFromMatrix
+
 # What value will be defined for an infinity number?
 # One of assume is define infinity as the large enough value.
 INF = 99999
@@ -28,6 +32,149 @@ def buildFWWeightMatrix(mat: typing.List[typing.List[int]]):
                 mat[i][j] = min(mat[i][j], (mat[i][k] + mat[k][j]))
 
 
+def buildFWWeightMatrixNumpy(dist: np.ndarray) -> np.ndarray:
+    '''
+    Problem 1 (vectorized): Floyd-Warshall algorithm over a NumPy matrix
+    Every k-phase is a single broadcast min(D, D[:, k] + D[k, :]),
+    written in place through one buffer that is reused by all the phases
+    Complexity: O(n^3)
+    :param dist: a float64 or int weight edge matrix (np.inf if there is no edge)
+    :return: the same matrix holding the shortest-path weights
+    '''
+    n = len(dist)
+    buf = np.empty_like(dist)
+    for k in range(n):
+        np.add(dist[:, k, None], dist[None, k, :], out=buf)
+        np.minimum(dist, buf, out=dist)
+    return dist
+
+
+def toNumpyMatrix(mat: typing.List[typing.List[int]]) -> np.ndarray:
+    '''
+    Converting a weight edge matrix (a list of lists with INF) to a float64 NumPy matrix
+    :param mat: a weight edge matrix
+    :return: a NumPy weight edge matrix
+    '''
+    return np.array(mat, dtype=np.float64)
+
+
+def fromNumpyMatrix(dist: np.ndarray) -> typing.List[typing.List[int]]:
+    '''
+    Converting a NumPy weight matrix back to a list of lists:
+    +inf becomes INF (no path), -inf of a diverged negative cycle stays -INF, whole numbers become int again
+    :param dist: a NumPy weight matrix
+    :return: a weight matrix as a list of lists
+    '''
+    return [[(INF if x > 0 else -INF) if math.isinf(x) else int(x) if float(x).is_integer() else x for x in row]
+            for row in dist.tolist()]
+
+
+def buildFWWeightMatrixVectorized(mat: typing.List[typing.List[int]]):
+    '''
+    Problem 1: a drop-in replacement of buildFWWeightMatrix
+    backed by the vectorized engine buildFWWeightMatrixNumpy
+    Complexity: O(n^3)
+    :param mat: a weight edge matrix, it is updated in place
+    :return:
+    '''
+    res = fromNumpyMatrix(buildFWWeightMatrixNumpy(toNumpyMatrix(mat)))
+    for i in range(len(mat)):
+        mat[i][:] = res[i]
+
+
+def initNextMatrix(dist: np.ndarray) -> np.ndarray:
+    '''
+    Next-hop matrix initialization: nxt[i][j] = j if there is an edge (i, j) otherwise -1
+    :param dist: a NumPy weight edge matrix (or a stack of matrices)
+    :return: an int32 next-hop matrix
+    '''
+    n = dist.shape[-1]
+    return np.where(np.isfinite(dist), np.arange(n, dtype=np.int32), np.int32(-1)).astype(np.int32)
+
+
+def buildNextMatrixNumpy(dist: np.ndarray) -> np.ndarray:
+    '''
+    Problem 2 (vectorized): Floyd-Warshall algorithm computing the shortest-path weights
+    and the next-hop matrix: nxt[i][j] is the vertex after i on the shortest path from i to j
+    Complexity: O(n^3), the memory is O(n^2)
+    :param dist: a float64 or int weight edge matrix, it is updated in place
+    :return: an int32 next-hop matrix (-1 if there is no path)
+    '''
+    n = len(dist)
+    nxt = initNextMatrix(dist)
+    buf = np.empty_like(dist)
+    better = np.empty(dist.shape, dtype=bool)
+    for k in range(n):
+        np.add(dist[:, k, None], dist[None, k, :], out=buf)
+        np.less(buf, dist, out=better)
+        np.copyto(dist, buf, where=better)
+        np.copyto(nxt, nxt[:, k, None], where=better)
+    return nxt
+
+
+def buildNextMatrix(mat: typing.List[typing.List[int]]) -> np.ndarray:
+    '''
+    Problem 2: Constructing the next-hop matrix of the shortest paths by Floyd-Warshall algorithm
+    Complexity: O(n^3)
+    :param mat: a weight edge matrix, it is updated in place to the shortest-path weights
+    :return: an int32 next-hop matrix
+    '''
+    n = len(mat)
+    for i in range(n):
+        mat[i][i] = 0
+    dist = toNumpyMatrix(mat)
+    nxt = buildNextMatrixNumpy(dist)
+    res = fromNumpyMatrix(dist)
+    for i in range(n):
+        mat[i][:] = res[i]
+    return nxt
+
+
+def reconstruct_path(nxt: np.ndarray, u: int, v: int) -> typing.List[int]:
+    '''
+    Reconstructing the shortest path from u to v by the next-hop matrix
+    Complexity: O(path length)
+    :param nxt: a next-hop matrix
+    :param u: a source vertex
+    :param v: a target vertex
+    :return: a list of the path vertices (an empty list if there is no path)
+    '''
+    if nxt[u][v] < 0:
+        return []
+    path = [u]
+    x = int(nxt[u][v])
+    if x == u:
+        return path
+    # a walk along a negative cycle may never come to v, so it is bounded by n hops
+    while len(path) <= len(nxt):
+        path.append(x)
+        if x == v:
+            break
+        x = int(nxt[x][v])
+    return path
+
+
+def format_path(path: typing.List[int]) -> str:
+    '''
+    Formatting a path as the string of its edges, for example: "0->1,1->2"
+    :param path: a list of the path vertices
+    :return: a path string ("" if there is no path)
+    '''
+    if len(path) == 1:
+        return str(path[0]) + "->" + str(path[0])
+    return ",".join(str(path[i]) + "->" + str(path[i + 1]) for i in range(len(path) - 1))
+
+
+def formatPathMatrix(nxt: np.ndarray) -> typing.List[typing.List[str]]:
+    '''
+    Building the path matrix of strings from the next-hop matrix
+    :param nxt: a next-hop matrix
+    :return: a path matrix
+    '''
+    n = len(nxt)
+    return [[format_path(reconstruct_path(nxt, i, j)) for j in range(n)] for i in range(n)]
+
+
 def buildPathMatrix(mat: typing.List[typing.List[int]]) -> typing.List[typing.List[str]]:
     '''
     Problem 2: Constructing the shortest path by Floyd-Warshall algorithm
@@ -37,55 +184,25 @@ def buildPathMatrix(mat: typing.List[typing.List[int]]) -> typing.List[typing.Li
     '''
     n = len(mat)
     for i in range(n):
-        for j in range(n):
-            if i == j:
-                mat[i][j] = 0
-    # path matrix initialization:
-    pathMat = [[str(i) + "->" + str(j) if mat[i][j] != INF else "" for j in range(n)] for i in range(n)]
+        mat[i][i] = 0
     print("Path matrix before FW:")
-    printMatrix(pathMat)
+    printMatrix(formatPathMatrix(initNextMatrix(toNumpyMatrix(mat))))
 
     # path matrix building:
-    for k in range(n):
-        for i in range(n):
-            for j in range(n):
-                if mat[i][k] != INF and mat[k][j] != INF and mat[i][k] + mat[k][j] < mat[i][j]:
-                    pathMat[i][j] = pathMat[i][k] + "," + pathMat[k][j]
-                mat[i][j] = min(mat[i][j], (mat[i][k] + mat[k][j]))
-    return pathMat
+    return formatPathMatrix(buildNextMatrix(mat))
 
 
 def connectComponentsOfGraph(mat: typing.List[typing.List[int]]) -> [int, typing.List[typing.List[int]]]:
     '''
     Problem 3: Find a number of connected component
     and get a list of vertices in each connected components
+    by union-find, the matrix does not need Floyd-Warshall algorithm first
+    Complexity: O(n^2 * alpha(n))
     :param mat: a int matrix
     :return:
     '''
-    # first, find a number of connected components
-    # in the undirected graph (square symmetric matrix)
-    n = len(mat)
-    connectComp = [0 for i in range(n)]
-    numComponentes = 0
-    for i in range(n):
-        if connectComp[i] == 0:
-            numComponentes += 1
-            # connectComp[i] - a component number of the vertex i
-            connectComp[i] = numComponentes
-        for j in range(i + 1, n):
-            # vertex j is not defined yet
-            if connectComp[j] == 0 and mat[i][j] != INF:
-                # the vertex j was defined and the path between (i,j) exists
-                connectComp[j] = numComponentes
-
-    # last, get a vertices list of each connected components
-    vertexInComponent = [[] for i in range(numComponentes)]
-    for i in range(len(connectComp)):
-        index = connectComp[i] - 1
-        vertexInComponent[index].append(i)
-
-    # printMatrix(vertexInComponent)
-    return numComponentes, vertexInComponent
+    # the undirected graph (square symmetric matrix)
+    return componentsFromMatrix(mat, lambda w: w != INF)
 
 
 def isConnected(mat: typing.List[typing.List[int]]) -> bool:
@@ -200,7 +317,7 @@ def checkComps():
     mat = initInt()
     print("Weight matrix before FW:")
     printMatrix(mat)
-    buildFWWeightMatrix(mat)
+    buildFWWeightMatrixVectorized(mat)
     print("Weight matrix after FW:")
     printMatrix(mat)
 
@@ -212,6 +329,18 @@ def checkComps():
         print("Component number", i, ", vertices:", res[1][i])
 
 
+def check_vectorized_matrices():
+    list_matrices = [initInt(), init1(), init2(), init3()]
+    for i in list_matrices:
+        mat = [row[:] for row in i]
+        buildFWWeightMatrix(mat)
+        buildFWWeightMatrixVectorized(i)
+        print("Weight matrix after vectorized FW:")
+        printMatrix(i)
+        print("Is it equal to the loop FW?", mat == i)
+        print()
+
+
 def printMatrix(mat: typing.List[typing.List[int]]):
     for i in range(len(mat)):
         print(mat[i])
@@ -220,4 +349,5 @@ def printMatrix(mat: typing.List[typing.List[int]]):
 if __name__ == '__main__':
     # checkFW()
     # checkComps()
+    # check_vectorized_matrices()
     check_weight_matrices()
@@ -0,0 +1,158 @@
+# Johnson's Algorithm for finding the shortest path between all the pairs of vertices
+# in a sparse weighted directed graph with negative weights.
+# One Bellman-Ford pass computes the potentials h, then the edges are reweighted to
+# w(u, v) + h(u) - h(v) >= 0 and Dijkstra's algorithm runs from each source.
+# Complexity: O(nm log n) instead of O(n^3) of Floyd-Warshall algorithm
+
+import typing
+import math
+import heapq
+
+import numpy as np
+
+from Sparse_Graph import CSRGraph, buildCSRGraph, csrFromWeightMatrix, edgeSources
+from Floyd_Warshall_Weights import fromNumpyMatrix
+
+INF = math.inf
+
+
+def johnsonPotentials(graph: CSRGraph) -> typing.Optional[np.ndarray]:
+    '''
+    Bellman-Ford algorithm from a virtual source connected to all the vertices by 0-weight edges
+    Complexity: O(nm)
+    :param graph: a CSR graph
+    :return: the potentials h (the shortest-path weights from the virtual source)
+     or None if there is a negative cycle
+    '''
+    n = graph.n
+    h = np.zeros(n)
+    if n == 0 or len(graph.indices) == 0:
+        return h
+    src = edgeSources(graph)
+    # the edges are grouped by their targets, so every round is one reduceat
+    order = np.argsort(graph.indices, kind='stable')
+    src, dst, w = src[order], graph.indices[order], graph.weights[order]
+    starts = np.flatnonzero(np.r_[True, dst[1:] != dst[:-1]])
+    targets = dst[starts]
+    for _ in range(n):
+        cand = np.minimum.reduceat(h[src] + w, starts)
+        better = cand < h[targets]
+        if not better.any():
+            return h
+        h[targets[better]] = cand[better]
+    return None
+
+
+def isNegativeCycle(graph: CSRGraph) -> bool:
+    '''
+    Check whether there is a negative cycle in the graph
+    Complexity: O(nm)
+    :param graph: a CSR graph
+    :return: true if there is a negative cycle otherwise false
+    '''
+    return johnsonPotentials(graph) is None
+
+
+def dijkstra(indptr: typing.List[int], indices: typing.List[int], weights: typing.List[float],
+             source: int) -> typing.List[float]:
+    '''
+    Dijkstra's algorithm over the CSR lists with non-negative weights
+    Complexity: O(m log n)
+    :return: the shortest-path weights from the source (INF if there is no path)
+    '''
+    dist = [INF] * (len(indptr) - 1)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            nd = d + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def johnsonAllPairs(graph: CSRGraph, sources: typing.Iterable[int] = None) \
+        -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+    '''
+    Johnson's algorithm: the shortest-path weights from every source, one row at a time,
+    so the n x n matrix is never allocated
+    Complexity: O(nm log n)
+    :param graph: a CSR graph
+    :param sources: the source vertices (all the vertices by default)
+    :return: an iterator of (source, an array of the shortest-path weights from the source)
+    '''
+    h = johnsonPotentials(graph)
+    if h is None:
+        raise ValueError("the graph has a negative cycle")
+    src = edgeSources(graph)
+    # reweighting, the rounding errors of float weights are clipped to 0
+    reweighted = np.maximum(graph.weights + h[src] - h[graph.indices], 0)
+    indptr, indices, weights = graph.indptr.tolist(), graph.indices.tolist(), reweighted.tolist()
+    for s in (range(graph.n) if sources is None else sources):
+        dist = np.array(dijkstra(indptr, indices, weights, s))
+        yield s, dist - h[s] + h
+
+
+def johnsonWeightMatrix(mat: typing.List[typing.List[int]]) -> typing.Tuple[bool, typing.List[typing.List[int]]]:
+    '''
+    Johnson's algorithm for a weight edge matrix, as Floyd_Warshall_Negative_Cycle gets it
+    :param mat: a weight edge matrix (INF if there is no edge)
+    :return: (true if there is a negative cycle, the shortest-path weight matrix or None)
+    '''
+    graph = csrFromWeightMatrix(mat)
+    if isNegativeCycle(graph):
+        return True, None
+    dist = np.empty((graph.n, graph.n))
+    for s, row in johnsonAllPairs(graph):
+        dist[s] = row
+    return False, fromNumpyMatrix(dist)
+
+
+#   (v1) ---------> (v2)
+#    /\\          /
+#      \        /
+#    2  \     / -10
+#        \  |/|
+#         (v3)
+
+def init8():
+    mat = [[0, 5, INF],
+           [INF, 0, -10],
+           [2, INF, 0]]
+    return mat
+
+
+def init9():
+    mat = [[0, 5, INF],
+           [INF, 0, INF],
+           [2, -10, 0]]
+    return mat
+
+
+def checkJohnson():
+    for mat in [init8(), init9()]:
+        print("Weight matrix:")
+        printMatrix(mat)
+        negative, dist = johnsonWeightMatrix(mat)
+        print("Is there a negative cycle?", "Yes" if negative else "No")
+        if not negative:
+            print("Shortest-path weight matrix by Johnson's algorithm:")
+            printMatrix(dist)
+        print()
+
+    graph = buildCSRGraph(5, [(0, 1, 3), (1, 2, -2), (2, 3, 2), (3, 1, 1), (0, 4, 1), (4, 3, -1)])
+    print("Sparse graph, the shortest paths from 0:", next(johnsonAllPairs(graph, [0]))[1].tolist())
+
+
+def printMatrix(mat: typing.List[typing.List[int]]):
+    for i in range(len(mat)):
+        print(mat[i])
+
+
+if __name__ == '__main__':
+    checkJohnson()
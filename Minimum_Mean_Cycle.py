@@ -0,0 +1,266 @@
+# The minimum mean cycle of a weighted directed graph: the cycle with the smallest average edge weight.
+# There is a negative cycle if and only if the minimum cycle mean is negative,
+# so the test does not need Floyd-Warshall algorithm (Floyd_Warshall_Negative_Cycle).
+# Karp's algorithm is O(nm) in every case, Howard's policy iteration is usually much faster.
+
+import typing
+import math
+from collections import deque
+
+import numpy as np
+
+from Sparse_Graph import CSRGraph, buildCSRGraph, buildCSRGraphFromArrays, csrFromWeightMatrix, edgeSources, \
+    transposeCSRGraph
+
+INF = math.inf
+
+
+def asCSRGraph(graph) -> CSRGraph:
+    '''
+    A CSR graph of a weight edge matrix (INF if there is no edge, the diagonal is skipped) or the CSR graph itself
+    '''
+    return graph if isinstance(graph, CSRGraph) else csrFromWeightMatrix(graph)
+
+
+def segmentArgmin(values: np.ndarray, indptr: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    '''
+    The minimum of every CSR segment values[indptr[u]:indptr[u + 1]] and the position of its first occurrence
+    :param values: an array of the edge values in the CSR order
+    :param indptr: the CSR segment bounds
+    :return: (the minimum of every segment, INF if it is empty; the position of the minimum, -1 if it is empty)
+    '''
+    n = len(indptr) - 1
+    counts = np.diff(indptr)
+    nonempty = counts > 0
+    mins = np.full(n, np.inf)
+    arg = np.full(n, -1, dtype=np.int64)
+    if len(values) == 0:
+        return mins, arg
+    mins[nonempty] = np.minimum.reduceat(values, indptr[:-1][nonempty])
+    owner = np.repeat(np.arange(n), counts)
+    hit = np.flatnonzero(values == mins[owner])
+    first = np.r_[True, owner[hit][1:] != owner[hit][:-1]]
+    arg[owner[hit][first]] = hit[first]
+    return mins, arg
+
+
+def rotateCycle(cycle: typing.List[int]) -> typing.List[int]:
+    '''
+    Rotating a cycle to start at its smallest vertex
+    '''
+    start = cycle.index(min(cycle))
+    return cycle[start:] + cycle[:start]
+
+
+def minimumMeanCycleKarp(graph) -> typing.Tuple[float, typing.List[int]]:
+    '''
+    Karp's algorithm: D[k][v] is the smallest weight of a walk of exactly k edges ending at v
+    (from any vertex), the minimum cycle mean is min over v of max over k of (D[n][v] - D[k][v]) / (n - k).
+    The cycle is the best cycle of the n-edge walk to the minimizing vertex.
+    Complexity: O(nm), the memory is O(n^2)
+    :param graph: a CSR graph or a weight edge matrix (INF if there is no edge, the diagonal is skipped)
+    :return: (the minimum cycle mean, the cycle vertices in the edge order), (INF, []) if there is no cycle
+    '''
+    graph = asCSRGraph(graph)
+    n = graph.n
+    if n == 0 or len(graph.indices) == 0:
+        return INF, []
+    reverse = transposeCSRGraph(graph)
+    D = np.full((n + 1, n), np.inf)
+    D[0] = 0
+    parent = np.full((n + 1, n), -1, dtype=np.int64)
+    for k in range(1, n + 1):
+        D[k], arg = segmentArgmin(D[k - 1][reverse.indices] + reverse.weights, reverse.indptr)
+        parent[k] = np.where(arg >= 0, reverse.indices[np.maximum(arg, 0)], -1)
+    finite = np.isfinite(D[n])
+    if not finite.any():
+        return INF, []
+    with np.errstate(invalid='ignore'):
+        ratio = (D[n][None, finite] - D[:n, finite]) / (n - np.arange(n))[:, None]
+    ratio[np.isnan(ratio)] = -np.inf
+    v = int(np.flatnonzero(finite)[np.argmin(ratio.max(axis=0))])
+
+    # the n-edge walk to v, walk[k] is its vertex at the level k
+    walk = [v]
+    for k in range(n, 0, -1):
+        walk.append(int(parent[k][walk[-1]]))
+    walk.reverse()
+    # the cycles of the walk, the weight between the levels a < b is D[b][walk[b]] - D[a][walk[a]]
+    best, cycle = INF, []
+    level = {}
+    stack = []
+    for k, x in enumerate(walk):
+        if x in level:
+            a = level[x]
+            mean = (D[k][x] - D[a][x]) / (k - a)
+            if mean < best:
+                best, cycle = mean, walk[a:k]
+            for y in stack[a - k:]:
+                del level[y]
+            del stack[a - k:]
+        level[x] = k
+        stack.append(x)
+    return float(best), rotateCycle(cycle)
+
+
+def pruneAcyclicVertices(graph: CSRGraph) -> np.ndarray:
+    '''
+    The vertices that can reach a cycle: the vertices without out-edges are removed one after the other
+    Complexity: O(n + m)
+    :param graph: a CSR graph
+    :return: a boolean array of the kept vertices
+    '''
+    reverse = transposeCSRGraph(graph)
+    degree = np.diff(graph.indptr).tolist()
+    indptr, indices = reverse.indptr.tolist(), reverse.indices.tolist()
+    kept = [True] * graph.n
+    queue = deque(v for v in range(graph.n) if degree[v] == 0)
+    while queue:
+        v = queue.popleft()
+        kept[v] = False
+        for e in range(indptr[v], indptr[v + 1]):
+            u = indices[e]
+            degree[u] -= 1
+            if degree[u] == 0:
+                queue.append(u)
+    return np.array(kept, dtype=bool)
+
+
+def evaluatePolicy(succ: typing.List[int], cost: typing.List[float]) \
+        -> typing.Tuple[typing.List[float], typing.List[float], typing.List[int]]:
+    '''
+    The value determination of Howard's algorithm over the policy graph v -> succ[v]:
+    every vertex reaches one cycle, eta[v] is its mean and x[v] is the bias
+    (x[v] = cost[v] - eta[v] + x[succ[v]], 0 at the first found vertex of every cycle)
+    Complexity: O(n)
+    :param succ: the policy successor of every vertex
+    :param cost: the weight of the policy edge of every vertex
+    :return: (eta, x, the cycle root of every vertex)
+    '''
+    n = len(succ)
+    eta, x, root = [0.0] * n, [0.0] * n, [-1] * n
+    state = [0] * n  # 0 - new, 1 - on the current walk, 2 - done
+    for s in range(n):
+        walk = []
+        v = s
+        while state[v] == 0:
+            state[v] = 1
+            walk.append(v)
+            v = succ[v]
+        if state[v] == 1:
+            # a new cycle from v to the end of the walk
+            cycle = walk[walk.index(v):]
+            mean = sum(cost[u] for u in cycle) / len(cycle)
+            eta[v], x[v], root[v], state[v] = mean, 0.0, v, 2
+            for u in reversed(cycle[1:]):
+                eta[u], x[u], root[u], state[u] = mean, cost[u] - mean + x[succ[u]], v, 2
+            walk = walk[:walk.index(v)]
+        for u in reversed(walk):
+            w = succ[u]
+            eta[u], x[u], root[u], state[u] = eta[w], cost[u] - eta[w] + x[w], root[w], 2
+    return eta, x, root
+
+
+def minimumMeanCycleHoward(graph, eps: float = 1e-9, maxIterations: int = 10000) \
+        -> typing.Tuple[float, typing.List[int]]:
+    '''
+    Howard's policy iteration: every vertex keeps one out-edge (the policy).
+    The policy is improved first by the reached cycle means eta, then by the biases x,
+    when it cannot be improved its smallest cycle mean is the minimum cycle mean.
+    Complexity: O(m) per iteration, a few iterations in practice
+    :param graph: a CSR graph or a weight edge matrix (INF if there is no edge, the diagonal is skipped)
+    :param eps: a tolerance of the improvements
+    :param maxIterations: a limit of the policy iterations
+    :return: (the minimum cycle mean, the cycle vertices in the edge order), (INF, []) if there is no cycle
+    '''
+    graph = asCSRGraph(graph)
+    kept = pruneAcyclicVertices(graph)
+    if not kept.any():
+        return INF, []
+    # the subgraph of the kept vertices, every vertex has an out-edge
+    ids = np.flatnonzero(kept)
+    number = np.cumsum(kept) - 1
+    src = edgeSources(graph)
+    alive = kept[src] & kept[graph.indices]
+    sub = buildCSRGraphFromArrays(len(ids), number[src[alive]], number[graph.indices[alive]], graph.weights[alive])
+    src, dst, w = edgeSources(sub), sub.indices, sub.weights
+    scale = eps * max(1.0, float(np.abs(w).max()))
+
+    _, policy = segmentArgmin(w, sub.indptr)
+    for _ in range(maxIterations):
+        eta, x, root = evaluatePolicy(dst[policy].tolist(), w[policy].tolist())
+        eta, x = np.array(eta), np.array(x)
+        # 1. a smaller reachable cycle mean
+        bestEta, arg = segmentArgmin(eta[dst], sub.indptr)
+        change = bestEta < eta - scale
+        if not change.any():
+            # 2. the same cycle mean with a smaller bias
+            value = np.where(np.abs(eta[dst] - eta[src]) <= scale, w - eta[src] + x[dst], np.inf)
+            bestX, arg = segmentArgmin(value, sub.indptr)
+            change = bestX < x - scale
+            if not change.any():
+                break
+        policy[change] = arg[change]
+    r = int(np.argmin(eta))
+    cycle, v = [], root[r]
+    succ = dst[policy]
+    while True:
+        cycle.append(int(ids[v]))
+        v = int(succ[v])
+        if v == root[r]:
+            break
+    return float(eta[r]), rotateCycle(cycle)
+
+
+def isNegativeCycle(graph) -> bool:
+    '''
+    Check whether there is a negative cycle: the minimum cycle mean is negative
+    :param graph: a CSR graph or a weight edge matrix (INF if there is no edge, the diagonal is skipped)
+    :return: true if there is a negative cycle otherwise false
+    '''
+    return minimumMeanCycleHoward(graph)[0] < 0
+
+
+#   (v1) ---------> (v2)
+#    /\\          /
+#      \        /
+#    2  \     / -10
+#        \  |/|
+#         (v3)
+
+def init8():
+    mat = [[0, 5, INF],
+           [INF, 0, -10],
+           [2, INF, 0]]
+    return mat
+
+
+def init9():
+    mat = [[0, 5, INF],
+           [INF, 0, INF],
+           [2, -10, 0]]
+    return mat
+
+
+def init10():
+    mat = [[INF, 4, INF, INF],
+           [INF, INF, 1, INF],
+           [3, INF, INF, 2],
+           [INF, 2, INF, INF]]
+    return mat
+
+
+def checkMinimumMeanCycle():
+    for mat in [init8(), init9(), init10()]:
+        for row in mat:
+            print(row)
+        print("Karp: the minimum cycle mean and the cycle:", minimumMeanCycleKarp(mat))
+        print("Howard: the minimum cycle mean and the cycle:", minimumMeanCycleHoward(mat))
+        print("Is there a negative cycle?", "Yes" if isNegativeCycle(mat) else "No")
+        print()
+    graph = buildCSRGraph(5, [(0, 1, 3), (1, 2, 1), (2, 0, 2), (2, 3, 1), (3, 4, -1), (4, 3, 2)])
+    print("Sparse graph, Howard:", minimumMeanCycleHoward(graph))
+
+
+if __name__ == '__main__':
+    checkMinimumMeanCycle()
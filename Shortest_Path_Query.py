@@ -0,0 +1,175 @@
+# Single-pair and single-source shortest-path queries by Dijkstra's algorithm.
+# A query touches only the vertices that are settled before it is answered,
+# instead of computing all the pairs by Floyd-Warshall algorithm.
+
+import typing
+import math
+import heapq
+
+import numpy as np
+
+from Sparse_Graph import CSRGraph, buildCSRGraph, transposeCSRGraph
+
+INF = math.inf
+
+
+def neighbors(graph, reverse: bool = False) -> typing.Callable[[int], typing.Iterable[typing.Tuple[int, float]]]:
+    '''
+    The edges of a vertex in a weight edge matrix (INF if there is no edge) or in a CSR graph
+    :param graph: a weight edge matrix or a CSR graph
+    :param reverse: the in-edges of a weight edge matrix instead of the out-edges
+    :return: a function from a vertex to its (neighbor, weight) pairs
+    '''
+    if isinstance(graph, CSRGraph):
+        def csrEdges(u):
+            b, e = graph.indptr[u], graph.indptr[u + 1]
+            return zip(graph.indices[b:e].tolist(), graph.weights[b:e].tolist())
+        return csrEdges
+
+    def rowEdges(u):
+        row = graph[u].tolist() if isinstance(graph, np.ndarray) else graph[u]
+        return ((v, w) for v, w in enumerate(row) if v != u and w != INF)
+
+    def columnEdges(u):
+        return ((v, graph[v][u]) for v in range(len(graph)) if v != u and graph[v][u] != INF)
+
+    return columnEdges if reverse else rowEdges
+
+
+def path_from_parents(parent: typing.Dict[int, int], v: int) -> typing.List[int]:
+    '''
+    Building the path to v by the parents of the shortest-path tree
+    :param parent: a parent of every reached vertex (None for the source)
+    :param v: a target vertex
+    :return: a list of the path vertices (an empty list if v is not reached)
+    '''
+    if v not in parent:
+        return []
+    path = []
+    while v is not None:
+        path.append(v)
+        v = parent[v]
+    return path[::-1]
+
+
+def dijkstraSearch(edges, u: int, target: int = None) -> typing.Tuple[typing.Dict[int, float], typing.Dict[int, int]]:
+    '''
+    Dijkstra's algorithm from u, it stops when the target is settled
+    Complexity: O(m log n) over the settled vertices
+    :return: (the distances, the parents) of the reached vertices
+    '''
+    dist, parent = {u: 0}, {u: None}
+    done = set()
+    heap = [(0, u)]
+    while heap:
+        d, x = heapq.heappop(heap)
+        if x in done:
+            continue
+        done.add(x)
+        if x == target:
+            break
+        for y, w in edges(x):
+            if w < 0:
+                raise ValueError("negative edge weight, use Johnson_APSP or Floyd-Warshall algorithm")
+            if d + w < dist.get(y, INF):
+                dist[y] = d + w
+                parent[y] = x
+                heapq.heappush(heap, (d + w, y))
+    return dist, parent
+
+
+def shortest_paths_from(graph, u: int) -> typing.Tuple[typing.Dict[int, float], typing.Dict[int, int]]:
+    '''
+    Single-source shortest paths by Dijkstra's algorithm (the weights must be non-negative)
+    Complexity: O(m log n)
+    :param graph: a weight edge matrix (INF if there is no edge) or a CSR graph
+    :param u: a source vertex
+    :return: (the shortest-path weight of every reachable vertex,
+     the parent of every reachable vertex for path_from_parents)
+    '''
+    return dijkstraSearch(neighbors(graph), u)
+
+
+def shortest_path(graph, u: int, v: int, reverse: CSRGraph = None) -> typing.Tuple[float, typing.List[int]]:
+    '''
+    Single-pair shortest path by bidirectional Dijkstra's algorithm (the weights must be non-negative).
+    The forward search from u and the backward search from v stop
+    as soon as the sum of their smallest keys reaches the best meeting distance.
+    A CSR graph needs its reverse graph (transposeCSRGraph) for the backward search,
+    without it the query is a forward Dijkstra search that stops at v.
+    :param graph: a weight edge matrix (INF if there is no edge) or a CSR graph
+    :param u: a source vertex
+    :param v: a target vertex
+    :param reverse: the reverse of a CSR graph
+    :return: (the shortest-path weight, a list of the path vertices), (INF, []) if there is no path
+    '''
+    if u == v:
+        return 0, [u]
+    if isinstance(graph, CSRGraph) and reverse is None:
+        dist, parent = dijkstraSearch(neighbors(graph), u, v)
+        return dist.get(v, INF), path_from_parents(parent, v)
+
+    edges = [neighbors(graph), neighbors(reverse) if reverse is not None else neighbors(graph, True)]
+    dist = [{u: 0}, {v: 0}]
+    parent = [{u: None}, {v: None}]
+    done = [set(), set()]
+    heaps = [[(0, u)], [(0, v)]]
+    best, meet = INF, None
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, x = heapq.heappop(heaps[side])
+        if x in done[side]:
+            continue
+        done[side].add(x)
+        for y, w in edges[side](x):
+            if w < 0:
+                raise ValueError("negative edge weight, use Johnson_APSP or Floyd-Warshall algorithm")
+            if d + w < dist[side].get(y, INF):
+                dist[side][y] = d + w
+                parent[side][y] = x
+                heapq.heappush(heaps[side], (d + w, y))
+            if y in dist[1 - side] and dist[side][y] + dist[1 - side][y] < best:
+                best, meet = dist[side][y] + dist[1 - side][y], y
+    if meet is None:
+        return INF, []
+    return best, path_from_parents(parent[0], meet) + path_from_parents(parent[1], meet)[::-1][1:]
+
+
+#             2
+#       (0)------(3)
+#       /          \
+#  18  /            \ 4
+#     /              \
+#   (4)             (2)
+#     \             /
+#      \          /
+#    5  \       / 1
+#        \    /
+#         (3)
+
+def initInt():
+    mat = [[0, 2, INF, INF, 18],
+           [2, 0, 4, INF, INF],
+           [INF, 4, 0, 1, INF],
+           [INF, INF, 1, 0, 5],
+           [18, INF, INF, 5, 0]]
+    return mat
+
+
+def checkQueries(mat=initInt()):
+    print("Weight matrix:")
+    for row in mat:
+        print(row)
+    for u, v in [(0, 4), (4, 1), (2, 2)]:
+        print(f'The shortest path from {u} to {v}:', shortest_path(mat, u, v))
+    print("The shortest paths from 0:", shortest_paths_from(mat, 0)[0])
+
+    graph = buildCSRGraph(5, [(0, 1, 2), (1, 2, 4), (2, 3, 1), (3, 4, 5), (0, 4, 18)])
+    print("Sparse graph, the shortest path from 0 to 4:",
+          shortest_path(graph, 0, 4, transposeCSRGraph(graph)))
+
+
+if __name__ == '__main__':
+    checkQueries()
@@ -0,0 +1,91 @@
+# A sparse weighted directed graph in the CSR (compressed sparse row) format:
+# the out-edges of the vertex u are indices[indptr[u]:indptr[u + 1]] with the weights weights[indptr[u]:indptr[u + 1]].
+
+import typing
+import math
+
+import numpy as np
+
+INF = math.inf
+
+
+class CSRGraph(typing.NamedTuple):
+    n: int  # a number of vertices
+    indptr: np.ndarray  # int64 array of the size n + 1
+    indices: np.ndarray  # int64 array of the edge's targets
+    weights: np.ndarray  # float64 array of the edge's weights
+
+
+def buildCSRGraphFromArrays(n: int, src, dst, weights) -> CSRGraph:
+    '''
+    Building a CSR graph from the arrays of an edge list
+    Complexity: O(m log m)
+    :param n: a number of vertices
+    :param src: an array of the edge's sources
+    :param dst: an array of the edge's targets
+    :param weights: an array of the edge's weights
+    :return: a CSR graph
+    '''
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(src) and (src.min() < 0 or src.max() >= n or dst.min() < 0 or dst.max() >= n):
+        raise ValueError("edge vertex out of range")
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return CSRGraph(n, indptr, dst[order], weights[order])
+
+
+def buildCSRGraph(n: int, edges: typing.Iterable[typing.Tuple[int, int, float]]) -> CSRGraph:
+    '''
+    Building a CSR graph from an edge list
+    :param n: a number of vertices
+    :param edges: an edge list of (u, v, weight)
+    :return: a CSR graph
+    '''
+    edges = np.array(list(edges), dtype=np.float64).reshape(-1, 3)
+    return buildCSRGraphFromArrays(n, edges[:, 0].astype(np.int64), edges[:, 1].astype(np.int64), edges[:, 2])
+
+
+def csrFromWeightMatrix(mat) -> CSRGraph:
+    '''
+    Building a CSR graph from a weight edge matrix (INF if there is no edge).
+    The diagonal is skipped, as the shortest-path modules set it to 0.
+    :param mat: a weight edge matrix
+    :return: a CSR graph
+    '''
+    dist = np.array(mat, dtype=np.float64)
+    edge = np.isfinite(dist)
+    np.fill_diagonal(edge, False)
+    src, dst = np.nonzero(edge)
+    return buildCSRGraphFromArrays(len(dist), src, dst, dist[src, dst])
+
+
+def edgeSources(graph: CSRGraph) -> np.ndarray:
+    '''
+    The source vertex of every edge in the CSR order
+    :param graph: a CSR graph
+    :return: an int64 array of the edge's sources
+    '''
+    return np.repeat(np.arange(graph.n, dtype=np.int64), np.diff(graph.indptr))
+
+
+def transposeCSRGraph(graph: CSRGraph) -> CSRGraph:
+    '''
+    Building the reverse graph (all the edges are reversed)
+    Complexity: O(m log m)
+    :param graph: a CSR graph
+    :return: a reverse CSR graph
+    '''
+    return buildCSRGraphFromArrays(graph.n, graph.indices, edgeSources(graph), graph.weights)
+
+
+def printGraph(graph: CSRGraph):
+    for u in range(graph.n):
+        b, e = graph.indptr[u], graph.indptr[u + 1]
+        print(u, "->", list(zip(graph.indices[b:e].tolist(), graph.weights[b:e].tolist())))
+
+
+if __name__ == '__main__':
+    printGraph(buildCSRGraph(4, [(0, 1, 2), (1, 2, -1), (2, 0, 4), (0, 3, 7), (2, 3, 1)]))
@@ -0,0 +1,107 @@
+'''
+ * Disjoint-set (union-find) with path compression and union by rank:
+ * connected components of an undirected graph directly from its edges,
+ * without the transitive closure by Floyd-Warshall algorithm.
+ * Complexity: O(m * alpha(n)), alpha is the inverse Ackermann function
+'''
+import typing
+
+
+def makeSets(n: int) -> typing.Tuple[typing.List[int], typing.List[int]]:
+    '''
+    n singleton sets
+    :param n: a number of elements
+    :return: (a parent of every element, a rank of every element)
+    '''
+    return list(range(n)), [0] * n
+
+
+def find(parent: typing.List[int], x: int) -> int:
+    '''
+    Finding the root of the set of x with path compression
+    :param parent: a parent of every element
+    :param x: an element
+    :return: the root of the set of x
+    '''
+    root = x
+    while parent[root] != root:
+        root = parent[root]
+    while parent[x] != root:
+        parent[x], x = root, parent[x]
+    return root
+
+
+def union(parent: typing.List[int], rank: typing.List[int], x: int, y: int) -> bool:
+    '''
+    Union of the sets of x and y by rank
+    :param parent: a parent of every element
+    :param rank: a rank of every element
+    :param x: an element
+    :param y: an element
+    :return: true if the sets were different otherwise false
+    '''
+    x, y = find(parent, x), find(parent, y)
+    if x == y:
+        return False
+    if rank[x] < rank[y]:
+        x, y = y, x
+    parent[y] = x
+    if rank[x] == rank[y]:
+        rank[x] += 1
+    return True
+
+
+def componentsFromEdges(n: int, edges: typing.Iterable[typing.Tuple[int, int]]) \
+        -> typing.Tuple[int, typing.List[typing.List[int]]]:
+    '''
+    Find a number of connected component and get a list of vertices in each connected components,
+    the components are numbered by their smallest vertex
+    Complexity: O(n + m * alpha(n))
+    :param n: a number of vertices
+    :param edges: an edge stream of (u, v), the edges are undirected
+    :return: (a number of components, a list of vertices of every component)
+    '''
+    parent, rank = makeSets(n)
+    for u, v in edges:
+        union(parent, rank, u, v)
+    label = {}
+    vertexInComponent = []
+    for v in range(n):
+        root = find(parent, v)
+        if root not in label:
+            label[root] = len(vertexInComponent)
+            vertexInComponent.append([])
+        vertexInComponent[label[root]].append(v)
+    return len(vertexInComponent), vertexInComponent
+
+
+def componentsFromMatrix(mat, isEdge: typing.Callable) \
+        -> typing.Tuple[int, typing.List[typing.List[int]]]:
+    '''
+    Connected components of the graph of a weight (or a boolean) matrix,
+    the matrix does not need the transitive closure
+    Complexity: O(n^2 * alpha(n))
+    :param mat: a weight edge matrix (INF if there is no edge) or a boolean matrix (a list or a NumPy array)
+    :param isEdge: the check of an edge entry: lambda w: w != INF for a weight matrix, bool for a boolean matrix
+    :return: (a number of components, a list of vertices of every component)
+    '''
+    return componentsFromEdges(len(mat), ((i, j) for i in range(len(mat))
+                                          for j, w in enumerate(mat[i]) if i != j and isEdge(w)))
+
+
+def checkComponents():
+    edges = [(0, 4), (4, 5), (1, 2), (2, 3), (3, 6)]
+    print("Edges:", edges)
+    res = componentsFromEdges(7, edges)
+    print("Number of components =", res[0])
+    for i in range(res[0]):
+        print("Component number", i, ", vertices:", res[1][i])
+    mat = [[True, False, True],
+           [False, True, False],
+           [True, False, True]]
+    print("Boolean matrix:", mat)
+    print("Components:", componentsFromMatrix(mat, bool))
+
+
+if __name__ == '__main__':
+    checkComponents()
@@ -5,6 +5,9 @@ import typing
 import math
 import random
 
+from Union_Find import componentsFromMatrix
+from Floyd_Warshall_Weights import buildNextMatrix, formatPathMatrix, initNextMatrix, toNumpyMatrix
+
 INF = math.inf
 
 
@@ -82,52 +85,24 @@ def buildPathMatrix(mat: typing.List[typing.List[int]]) -> typing.List[typing.Li
     n = len(mat)
     for i in range(n):
         mat[i][i] = 0
-    # path matrix initialization:
-    pathMat = [[str(i) + "->" + str(j) if mat[i][j] != INF else "" for j in range(n)] for i in range(n)]
     print("Path matrix before FW:")
-    printMatrix(pathMat)
+    printMatrix(formatPathMatrix(initNextMatrix(toNumpyMatrix(mat))))
 
     # path matrix building:
-    for k in range(n):
-        for i in range(n):
-            for j in range(n):
-                if mat[i][k] != INF and mat[k][j] != INF and mat[i][k] + mat[k][j] < mat[i][j]:
-                    pathMat[i][j] = pathMat[i][k] + "," + pathMat[k][j]
-                mat[i][j] = min(mat[i][j], (mat[i][k] + mat[k][j]))
-    return pathMat
+    return formatPathMatrix(buildNextMatrix(mat))
 
 
 def connectComponentsOfGraph(mat: typing.List[typing.List[int]]) -> [int, typing.List[typing.List[int]]]:
     '''
     Problem 3: Find a number of connected component
     and get a list of vertices in each connected components
+    by union-find, the matrix does not need Floyd-Warshall algorithm first
+    Complexity: O(n^2 * alpha(n))
     :param mat: a int matrix
     :return:
     '''
-    # first, find a number of connected components
-    # in the undirected graph (square symmetric matrix)
-    n = len(mat)
-    connectComp = [0 for i in range(n)]
-    numComponentes = 0
-    for i in range(n):
-        if connectComp[i] == 0:
-            numComponentes += 1
-            # connectComp[i] - a component number of the vertex i
-            connectComp[i] = numComponentes
-        for j in range(i + 1, n):
-            # vertex j is not defined yet
-            if connectComp[j] == 0 and mat[i][j] != INF:
-                # the vertex j was defined and the path between (i,j) exists
-                connectComp[j] = numComponentes
-
-    # last, get a vertices list of each connected components
-    vertexInComponent = [[] for i in range(numComponentes)]
-    for i in range(len(connectComp)):
-        index = connectComp[i] - 1
-        vertexInComponent[index].append(i)
-
-    # printMatrix(vertexInComponent)
-    return numComponentes, vertexInComponent
+    # the undirected graph (square symmetric matrix)
+    return componentsFromMatrix(mat, lambda w: w != INF)
 
 
 def isConnected(mat: typing.List[typing.List[int]]) -> bool: